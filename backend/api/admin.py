@@ -1,7 +1,10 @@
 from django.contrib import admin, messages
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import mark_safe
-from .models import Product, Category, Tag, Order, SiteSettings
-from .utils import send_payment_verified_email
+from .images import smallest_derivative_url
+from .models import Product, Category, Tag, Order, OutboundEmail, SiteSettings
+from .utils import send_payment_verified_emails
 
 
 @admin.register(Category)
@@ -98,9 +101,10 @@ class OrderAdmin(admin.ModelAdmin):
     def payment_screenshot_preview(self, obj):
         if obj.payment_screenshot and hasattr(obj.payment_screenshot, 'url'):
             url = obj.payment_screenshot.url
+            preview = smallest_derivative_url(obj, 'payment_screenshot', min_width=640)
             return mark_safe(
                 f'<a href="{url}" target="_blank" rel="noopener">'
-                f'<img src="{url}" style="max-height:200px; border-radius:8px;" />'
+                f'<img src="{preview}" style="max-height:200px; border-radius:8px;" />'
                 f'</a>'
             )
         return "No screenshot uploaded"
@@ -109,28 +113,53 @@ class OrderAdmin(admin.ModelAdmin):
     def payment_screenshot_thumb(self, obj):
         if obj.payment_screenshot and hasattr(obj.payment_screenshot, 'url'):
             url = obj.payment_screenshot.url
+            # The smallest resized copy instead of the full upload scaled down
+            thumb = smallest_derivative_url(obj, 'payment_screenshot')
             return mark_safe(
                 f'<a href="{url}" target="_blank" rel="noopener">'
-                f'<img src="{url}" style="height:40px; border-radius:4px;" />'
+                f'<img src="{thumb}" style="height:40px; border-radius:4px;" />'
                 f'</a>'
             )
         return "-"
     payment_screenshot_thumb.short_description = "Screenshot"
 
     def mark_payment_verified(self, request, queryset):
-        updated = 0
-        for order in queryset:
-            order.status = 'verified'
-            order.save(update_fields=['status', 'updated_at'])
-            try:
-                send_payment_verified_email(order)
-            except Exception as exc:
-                print(f"Failed to send verified email for order {order.id}: {exc}")
-            updated += 1
-        self.message_user(request, f"{updated} order(s) marked as verified and email sent.", messages.SUCCESS)
+        orders = list(queryset.select_related('product'))
+        # save() rather than queryset.update(), so post_save receivers run
+        with transaction.atomic():
+            for order in orders:
+                order.status = 'verified'
+                order.save(update_fields=['status', 'updated_at'])
+        updated = len(orders)
+        # One batched send over pooled SMTP connections instead of a new
+        # connection per order
+        unsent = send_payment_verified_emails(orders)
+        sent = len(orders) - len(unsent)
+        self.message_user(request, f"{updated} order(s) marked as verified and {sent} email(s) sent.", messages.SUCCESS)
+        if unsent:
+            self.message_user(
+                request,
+                "Emails not sent for order(s) " + ', '.join(f'#{order.id}' for order in unsent) + "; see the server log.",
+                messages.WARNING,
+            )
     mark_payment_verified.short_description = "Mark payment as verified (send email)"
 
 
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'order', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['order__email', 'last_error']
+    raw_id_fields = ['order']
+    readonly_fields = ['attempts', 'last_error', 'sent_at', 'created_at', 'updated_at']
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(status='pending', next_attempt_at=timezone.now())
+        self.message_user(request, f"{updated} email(s) queued for immediate retry.", messages.SUCCESS)
+    retry_now.short_description = "Retry selected emails now"
+
+
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
     fieldsets = (
@@ -0,0 +1,214 @@
+"""
+Cache helpers: generation tokens, the storefront page cache and the
+read-only API response cache.
+
+Cached entries embed the current token of every "generation" they depend
+on (e.g. 'catalog', 'product:<slug>'). Bumping a generation just deletes
+its token, so every entry built from it becomes unreachable in O(1) and
+ages out of the cache on its own.
+
+Tokens start with the time they were created, i.e. when their generation
+last changed, which gives cached views a Last-Modified they can check
+revalidations against before rendering anything.
+"""
+import hashlib
+import math
+import time
+import uuid
+from functools import lru_cache, wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import NotAcceptable
+
+
+# Responses may change with a deploy, whatever the generations say
+_STARTED_AT = time.time()
+
+
+@lru_cache(maxsize=None)
+def fragment_cache_version(*template_names):
+    """
+    Short hash that changes with a deploy that changes what these templates
+    render: their source, the static files manifest (asset URLs) and
+    TEMPLATE_CACHE_VERSION (for changes in template tags and filters).
+    Computed once per process.
+    """
+    from django.template.loader import get_template
+
+    digest = hashlib.md5(settings.TEMPLATE_CACHE_VERSION.encode())
+    for name in template_names:
+        digest.update(get_template(name).template.source.encode())
+    read_manifest = getattr(staticfiles_storage, 'read_manifest', None)
+    manifest = read_manifest() if read_manifest is not None else None
+    digest.update((manifest or '').encode())
+    return digest.hexdigest()[:12]
+
+
+def _generation_key(name):
+    # Names can contain user input (product slugs from the query string)
+    return 'api:gen:' + hashlib.md5(name.encode()).hexdigest()
+
+
+def get_generations(names):
+    """Return the current token for each generation name, creating missing ones"""
+    keys = {_generation_key(name): name for name in names}
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            cache.add(key, f'{time.time():.6f}-{uuid.uuid4().hex[:16]}', None)
+            tokens[key] = cache.get(key)
+    return [tokens[key] for key in keys]
+
+
+def bump_generations(*names):
+    """Invalidate everything cached against these generations"""
+    if names:
+        cache.delete_many([_generation_key(name) for name in names])
+
+
+def generations_last_modified(tokens):
+    """
+    Last-Modified of a response built from these generations: when the
+    newest of them (or this process) started, rounded up to a whole second.
+    None while that second is still running, as a change later in it would
+    get the same Last-Modified.
+    """
+    times = [_STARTED_AT]
+    for token in tokens:
+        try:
+            times.append(float(token.partition('-')[0]))
+        except ValueError:
+            # Created before tokens carried a time
+            return None
+    last_modified = math.ceil(max(times))
+    return last_modified if time.time() >= last_modified else None
+
+
+def _validator_headers(response, etag, last_modified):
+    if etag:
+        response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Let clients keep the response but revalidate it on every use
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def serve_cached(request, key, timeout, build, last_modified=None):
+    """
+    Return the response cached under `key`, calling `build()` on a miss.
+
+    Only complete 200 responses are stored. Responses are served with
+    ETag/Last-Modified, answer conditional GETs with 304, and tell clients
+    to revalidate on every use. With a `last_modified` hint (see
+    generations_last_modified()), If-Modified-Since is answered before the
+    cache is read or anything is rendered.
+    """
+    if last_modified is not None and 'HTTP_IF_NONE_MATCH' not in request.META:
+        # If-None-Match takes precedence and needs the entry's ETag
+        response = get_conditional_response(request, last_modified=last_modified)
+        if response is not None:
+            return _validator_headers(response, None, last_modified)
+
+    entry = cache.get(key)
+    if entry is None:
+        response = build()
+        if response.status_code != 200 or response.streaming:
+            return response
+        if hasattr(response, 'render'):
+            # DRF/template responses render lazily
+            response.render()
+        entry = {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+            'last_modified': last_modified or int(time.time()),
+        }
+        cache.set(key, entry, timeout)
+
+    response = get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified']
+    )
+    if response is None:
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    return _validator_headers(response, entry['etag'], entry['last_modified'])
+
+
+def cache_storefront_page(dependencies, query_params=()):
+    """
+    Cache a storefront view's rendered HTML.
+
+    `dependencies(request)` returns the generation names the page is built
+    from. Only the listed query parameters take part in the cache key, so
+    tracking parameters from ads don't fragment the cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            query = sorted(
+                (name, request.GET[name]) for name in query_params if request.GET.get(name)
+            )
+            tokens = get_generations(dependencies(request))
+            raw_key = f"{request.path}?{urlencode(query)}|{'|'.join(tokens)}"
+            key = 'api:page:' + hashlib.md5(raw_key.encode()).hexdigest()
+            return serve_cached(
+                request, key, settings.PAGE_CACHE_TIMEOUT, lambda: view(request, *args, **kwargs),
+                last_modified=generations_last_modified(tokens),
+            )
+        return wrapper
+    return decorator
+
+
+class CachedResponseMixin:
+    """
+    Cache the rendered JSON of a read-only API view.
+
+    Entries are keyed by absolute URL (scheme, host, path and every query
+    parameter), the negotiated media type (e.g. `application/json; indent=4`
+    renders differently) plus the tokens of `cache_dependencies`, so bumping
+    one of those generations invalidates them all. Only JSON responses are
+    cached; the browsable API is always rendered fresh.
+    """
+    cache_dependencies = ('catalog',)
+
+    def dispatch(self, request, *args, **kwargs):
+        media_type = None
+        if request.method in ('GET', 'HEAD'):
+            media_type = self._json_media_type(request, kwargs)
+        if media_type is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        query = sorted(request.GET.lists())
+        tokens = get_generations(self.cache_dependencies)
+        raw_key = (
+            f"{request.build_absolute_uri(request.path)}?{urlencode(query, doseq=True)}"
+            f"|{media_type}|{'|'.join(tokens)}"
+        )
+        key = 'api:response:' + hashlib.md5(raw_key.encode()).hexdigest()
+        response = serve_cached(
+            request, key, settings.API_CACHE_TIMEOUT, lambda: super(CachedResponseMixin, self).dispatch(
+                request, *args, **kwargs
+            ), last_modified=generations_last_modified(tokens),
+        )
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def _json_media_type(self, request, kwargs):
+        """The media type DRF will render this request as, if it's JSON"""
+        # The same negotiation dispatch() runs, on the same Accept and ?format=
+        drf_request = self.initialize_request(request)
+        try:
+            renderer, media_type = self.get_content_negotiator().select_renderer(
+                drf_request, self.get_renderers(), self.get_format_suffix(**kwargs)
+            )
+        except NotAcceptable:
+            return None
+        return media_type if renderer.format == 'json' else None
@@ -0,0 +1,205 @@
+"""
+In-memory faceted index of the active catalog.
+
+A CatalogSnapshot keeps one bitmap (a Python int, bit i = product i) per
+category, per tag and for the featured flag, plus prices and sort orders.
+Filtering is a handful of big-int ANDs and facet counts are popcounts, so
+a combined filter + sort + facet query takes microseconds and ends in a
+single `in_bulk()` fetch of the page being shown.
+
+The snapshot is rebuilt in two queries whenever the 'catalog' cache
+generation is bumped (on any product, category or tag change, see
+signals.py), so every worker picks up changes on its next request.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, InvalidOperation
+
+from .caching import get_generations
+from .models import Product
+
+# Upper bounds of the price facet buckets; the last bucket is open-ended
+PRICE_BUCKETS = (Decimal('100'), Decimal('200'), Decimal('500'), Decimal('1000'))
+
+ORDERINGS = ('created_at', 'price', 'name')
+
+
+def _bitmap(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _popcount(mask):
+    return bin(mask).count('1')
+
+
+def to_decimal(value):
+    """Parse a price query parameter; None when missing or invalid"""
+    if value in (None, ''):
+        return None
+    try:
+        value = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
+
+class CatalogSnapshot:
+    """
+    Immutable snapshot of the active products. Positions follow the
+    default ordering (-created_at, -id).
+    """
+
+    def __init__(self, product_model=Product):
+        rows = list(product_model.objects.filter(is_active=True).order_by('-created_at', '-id').values_list(
+            'id', 'price', 'category_id', 'is_featured', 'name',
+        ))
+        self.size = size = len(rows)
+        self.ids = [row[0] for row in rows]
+        self.position = {pk: pos for pos, pk in enumerate(self.ids)}
+        self.all = (1 << size) - 1
+
+        self.by_price = sorted(range(size), key=lambda pos: rows[pos][1])
+        self.sorted_prices = [rows[pos][1] for pos in self.by_price]
+        # Position lists per ordering; sorted() is stable (also with
+        # reverse=True), so ties keep the default order
+        keys = {
+            'created_at': lambda pos: -pos,
+            'price': lambda pos: rows[pos][1],
+            'name': lambda pos: rows[pos][4].lower(),
+        }
+        self.sort_orders = {}
+        for field, key in keys.items():
+            self.sort_orders[field] = sorted(range(size), key=key)
+            self.sort_orders['-' + field] = sorted(range(size), key=key, reverse=True)
+
+        categories = {}
+        for pos, row in enumerate(rows):
+            if row[2] is not None:
+                categories.setdefault(row[2], []).append(pos)
+        self.categories = {pk: _bitmap(positions, size) for pk, positions in categories.items()}
+
+        tags = {}
+        for product_id, tag_id in product_model.tags.through.objects.filter(
+            product__is_active=True
+        ).values_list('product_id', 'tag_id'):
+            tags.setdefault(tag_id, []).append(self.position[product_id])
+        self.tags = {pk: _bitmap(positions, size) for pk, positions in tags.items()}
+
+        self.featured = _bitmap((pos for pos, row in enumerate(rows) if row[3]), size)
+
+        self.price_buckets = []
+        lower = None
+        for upper in PRICE_BUCKETS + (None,):
+            self.price_buckets.append((lower, upper, self.price_mask(lower, upper, include_max=False)))
+            lower = upper
+
+    def price_mask(self, min_price=None, max_price=None, include_max=True):
+        start = 0 if min_price is None else bisect_left(self.sorted_prices, min_price)
+        if max_price is None:
+            end = self.size
+        else:
+            end = (bisect_right if include_max else bisect_left)(self.sorted_prices, max_price)
+        return _bitmap(self.by_price[start:end], self.size)
+
+    def masks(self, category=None, tags=(), is_featured=None, min_price=None, max_price=None):
+        """Bitmap of each active filter, keyed by facet name"""
+        masks = {}
+        if category is not None:
+            masks['category'] = self.categories.get(category, 0)
+        if tags:
+            # Any of the tags, like ?tags= on the product list
+            tag_mask = 0
+            for tag in tags:
+                tag_mask |= self.tags.get(tag, 0)
+            masks['tags'] = tag_mask
+        if is_featured is not None:
+            masks['is_featured'] = self.featured if is_featured else self.all & ~self.featured
+        if min_price is not None or max_price is not None:
+            masks['price'] = self.price_mask(min_price, max_price)
+        return masks
+
+    @staticmethod
+    def combine(masks, all_mask, exclude=None):
+        result = all_mask
+        for name, mask in masks.items():
+            if name != exclude:
+                result &= mask
+        return result
+
+    def filter(self, **filters):
+        """Bitmap of the products matching every filter (see masks())"""
+        return self.combine(self.masks(**filters), self.all)
+
+    def count(self, mask):
+        return _popcount(mask)
+
+    def ids_for(self, mask, ordering='-created_at', offset=0, limit=None):
+        """
+        Ids of the products in `mask`, sorted by one of ORDERINGS (prefix
+        with '-' to reverse)
+        """
+        order = self.sort_orders.get(ordering, self.sort_orders['-created_at'])
+        # One string conversion instead of a big-int shift per product
+        flags = format(mask, f'0{self.size}b')[::-1] if self.size else ''
+        end = None if limit is None else offset + limit
+        ids = []
+        for pos in order:
+            if flags[pos] == '1':
+                ids.append(self.ids[pos])
+                if len(ids) == end:
+                    break
+        return ids[offset:]
+
+    def facets(self, **filters):
+        """
+        Counts per category, tag and price bucket ([min, max) ranges) and of
+        featured products. Each facet is counted ignoring its own filter, so
+        the counts show what selecting another value would return.
+        """
+        masks = self.masks(**filters)
+
+        base = self.combine(masks, self.all, exclude='category')
+        categories = {pk: _popcount(base & mask) for pk, mask in self.categories.items()}
+
+        base = self.combine(masks, self.all, exclude='price')
+        buckets = [
+            {'min': lower, 'max': upper, 'count': _popcount(base & mask)}
+            for lower, upper, mask in self.price_buckets
+        ]
+
+        base = self.combine(masks, self.all, exclude='tags')
+        tags = {pk: _popcount(base & mask) for pk, mask in self.tags.items()}
+
+        return {
+            'categories': [{'id': pk, 'count': count} for pk, count in categories.items() if count],
+            'tags': [{'id': pk, 'count': count} for pk, count in tags.items() if count],
+            'price': buckets,
+            'is_featured': _popcount(self.combine(masks, self.all, exclude='is_featured') & self.featured),
+        }
+
+
+_snapshot = None
+_snapshot_token = None
+_lock = threading.Lock()
+
+
+def get_catalog_snapshot():
+    """Return the current snapshot, rebuilding it after a catalog change"""
+    global _snapshot, _snapshot_token
+    token, = get_generations(['catalog'])
+    if _snapshot is None or _snapshot_token != token:
+        with _lock:
+            if _snapshot is None or _snapshot_token != token:
+                _snapshot = CatalogSnapshot()
+                _snapshot_token = token
+    return _snapshot
+
+
+def fetch_products(ids, queryset=None):
+    """Fetch products by id in one query, keeping the order of `ids`"""
+    queryset = Product.objects.all() if queryset is None else queryset
+    products = queryset.in_bulk(ids)
+    return [products[pk] for pk in ids if pk in products]
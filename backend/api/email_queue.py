@@ -0,0 +1,125 @@
+"""
+Durable outbound email queue.
+
+Views enqueue notifications inside the order transaction; the
+`process_email_queue` management command drains the queue with a pool of
+worker threads, retrying failed deliveries with exponential backoff.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .utils import EMAIL_SENDERS
+
+
+def enqueue_email(order, kind):
+    """
+    Queue an email for an order. Call inside the transaction that writes
+    the order so the email is only sent if the order is committed.
+    """
+    return OutboundEmail.objects.create(order=order, kind=kind)
+
+
+def claim_batch(limit):
+    """
+    Claim up to `limit` due emails for this worker and return their ids.
+
+    A claim moves the row to 'sending' and pushes `next_attempt_at` out by
+    the lease period, so rows left behind by a crashed worker are picked up
+    again once the lease expires.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE_SECONDS)
+    due = OutboundEmail.objects.filter(
+        status__in=['pending', 'sending'],
+        next_attempt_at__lte=now,
+    )
+    candidates = list(due.order_by('next_attempt_at').values_list('id', flat=True)[:limit])
+
+    claimed = []
+    for pk in candidates:
+        # Conditional update so concurrent workers never claim the same row
+        updated = due.filter(pk=pk).update(
+            status='sending',
+            next_attempt_at=lease_until,
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(pk)
+    return claimed
+
+
+def _retry_delay(attempts):
+    base = settings.EMAIL_QUEUE_RETRY_BACKOFF
+    return timedelta(seconds=base * (2 ** max(attempts - 1, 0)))
+
+
+def deliver(pk):
+    """
+    Send one claimed email and record the outcome.
+
+    Returns True if the email was sent.
+    """
+    email = OutboundEmail.objects.select_related('order__product').get(pk=pk)
+    sender = EMAIL_SENDERS[email.kind]
+
+    try:
+        sent = sender(email.order, fail_silently=False)
+    except Exception as exc:
+        email.last_error = str(exc) or exc.__class__.__name__
+        if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+            email.status = 'failed'
+        else:
+            email.status = 'pending'
+            email.next_attempt_at = timezone.now() + _retry_delay(email.attempts)
+        email.save(update_fields=['status', 'last_error', 'next_attempt_at', 'updated_at'])
+        return False
+
+    if not sent:
+        # Nothing to send (e.g. download link email without a link); retrying won't help
+        email.status = 'failed'
+        email.last_error = 'Nothing to send for this order'
+        email.save(update_fields=['status', 'last_error', 'updated_at'])
+        return False
+
+    email.status = 'sent'
+    email.sent_at = timezone.now()
+    email.last_error = ''
+    email.save(update_fields=['status', 'sent_at', 'last_error', 'updated_at'])
+    return True
+
+
+def _deliver_in_thread(pk):
+    try:
+        return deliver(pk)
+    finally:
+        # Each worker thread owns its own DB connection
+        connection.close()
+
+
+def process_queue(workers=None, batch_size=50):
+    """
+    Claim and deliver one batch of due emails using a pool of worker threads.
+
+    Returns a (sent, failed) tuple. With `workers=1` delivery runs inline on
+    the calling thread's connection, which is what tests using Django's
+    locmem email backend (and TestCase transactions) need.
+    """
+    ids = claim_batch(batch_size)
+    if not ids:
+        return 0, 0
+
+    workers = workers or settings.EMAIL_QUEUE_WORKERS
+    if workers <= 1:
+        results = [deliver(pk) for pk in ids]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_deliver_in_thread, ids))
+
+    sent = sum(1 for ok in results if ok)
+    return sent, len(results) - sent
@@ -0,0 +1,53 @@
+"""
+Email rendering service.
+
+Keeps compiled email templates in memory and takes the site-wide part of
+the email context (sender, support address, site name/URL) from the cached
+SiteSettings.load(), so rendering a batch of emails costs one template
+render per part and no extra queries.
+"""
+from django.conf import settings
+from django.template.loader import get_template
+
+from .models import SiteSettings
+
+
+class EmailRenderer:
+    def __init__(self):
+        self._templates = {}
+
+    def get_template(self, template_name):
+        """Return a compiled template, compiling it once per process"""
+        template = self._templates.get(template_name)
+        if template is None:
+            template = get_template(template_name)
+            # Keep template edits visible without a restart in development
+            if not settings.DEBUG:
+                self._templates[template_name] = template
+        return template
+
+    def site_context(self):
+        """Return the site-wide context shared by every email"""
+        settings_obj = SiteSettings.load()
+        support_email = settings_obj.support_email or getattr(settings, 'SUPPORT_EMAIL', '')
+        return {
+            'site_name': settings.SITE_NAME,
+            'site_url': settings.SITE_URL,
+            'support_email': support_email,
+            'from_email': settings_obj.from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', support_email),
+        }
+
+    def render(self, template_base, context):
+        """
+        Render `emails/<template_base>.html` and `emails/<template_base>.txt`
+
+        Returns:
+            (html_message, plain_message)
+        """
+        context = {**self.site_context(), **context}
+        html_message = self.get_template(f'emails/{template_base}.html').render(context)
+        plain_message = self.get_template(f'emails/{template_base}.txt').render(context)
+        return html_message, plain_message
+
+
+renderer = EmailRenderer()
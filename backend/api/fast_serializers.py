@@ -0,0 +1,251 @@
+"""
+Fast read-only serializers for the hot read endpoints.
+
+Drop-in replacements for ProductListSerializer, ProductDetailSerializer and
+OrderDetailSerializer on reads: same constructor (instance, many, context),
+same `.data`, same output, but built with plain attribute access from
+eager-loaded rows instead of DRF's per-field machinery. Media URLs are made
+absolute by prefixing a per-response absolute MEDIA_URL instead of calling
+request.build_absolute_uri() per file, and the time zone is looked up once
+per response.
+
+The DRF serializers in serializers.py stay the reference; check the output
+still matches after changing either side with
+`python manage.py benchmark_serializers --verify`.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+from rest_framework import ISO_8601, serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from .images import FORMATS, srcset
+from .related import related_products
+from .serializers import OrderDetailSerializer, ProductDetailSerializer, ProductListSerializer
+
+_CENT = Decimal('0.01')
+_COERCE_DECIMAL = api_settings.COERCE_DECIMAL_TO_STRING
+_ISO_DATETIMES = (api_settings.DATETIME_FORMAT or '').lower() == ISO_8601
+_drf_datetime = serializers.DateTimeField()
+
+
+def _decimal(value):
+    # DRF's DecimalField for the models' decimal_places=2 fields
+    if value is None:
+        return None
+    value = value.quantize(_CENT)
+    return '{:f}'.format(value) if _COERCE_DECIMAL else value
+
+
+class ResponseContext:
+    """Per-response state: absolute media URL prefixes and the time zone"""
+
+    def __init__(self, request):
+        self.request = request
+        self.prefixes = {}
+        self.timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def url(self, obj, field_name):
+        """URL of a file field, absolute when there is a request; '' when empty"""
+        # The raw name when the FieldFile hasn't been built yet
+        value = obj.__dict__.get(field_name)
+        name = getattr(value, 'name', value)
+        if not name:
+            return ''
+        return self.file_url(obj._meta.get_field(field_name).storage, name)
+
+    def file_url(self, storage, name):
+        """URL of a stored file, absolute when there is a request"""
+        if not isinstance(storage, FileSystemStorage):
+            url = storage.url(name)
+            return self.request.build_absolute_uri(url) if self.request else url
+        prefix = self.prefixes.get(storage)
+        if prefix is None:
+            prefix = storage.base_url
+            if self.request:
+                prefix = self.request.build_absolute_uri(prefix)
+            self.prefixes[storage] = prefix
+        # What FileSystemStorage.url() joins onto base_url
+        return prefix + filepath_to_uri(name).lstrip('/')
+
+    def datetime(self, value):
+        """DRF's DateTimeField output"""
+        if not value or not _ISO_DATETIMES or self.timezone is None or value.tzinfo is None:
+            return _drf_datetime.to_representation(value)
+        value = value.astimezone(self.timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+
+def _category(category):
+    if category is None:
+        return None
+    return {
+        'id': category.id,
+        'name': category.name,
+        'slug': category.slug,
+        'description': category.description,
+    }
+
+
+def _tags(product):
+    # Read the prefetch cache directly; product.tags builds a manager per call
+    tags = getattr(product, '_prefetched_objects_cache', {}).get('tags')
+    if tags is None:
+        tags = product.tags.all()
+    return [{'id': tag.id, 'name': tag.name, 'slug': tag.slug} for tag in tags]
+
+
+def _display_image(product, ctx):
+    return ctx.url(product, 'image') or product.image_url or ''
+
+
+def _display_image_srcset(product, ctx):
+    # images.derivative_urls() without building the FieldFile
+    manifest = product.image_derivatives
+    value = product.__dict__.get('image')
+    if not manifest or not value or manifest.get('source') != getattr(value, 'name', value):
+        return {}
+    storage = product._meta.get_field('image').storage
+    return {
+        fmt: srcset([(width, ctx.file_url(storage, name)) for width, name in manifest[fmt]])
+        for fmt in FORMATS if manifest.get(fmt)
+    }
+
+
+def product_list_dict(obj, ctx):
+    """ProductListSerializer output for one product"""
+    return {
+        'id': obj.id,
+        'name': obj.name,
+        'slug': obj.slug,
+        'short_description': obj.short_description,
+        'price': _decimal(obj.price),
+        'original_price': _decimal(obj.original_price),
+        'discount_percentage': obj.discount_percentage,
+        'display_image': _display_image(obj, ctx),
+        'display_image_srcset': _display_image_srcset(obj, ctx),
+        'payment_qr': ctx.url(obj, 'payment_qr'),
+        'badge_text': obj.badge_text,
+        'category': _category(obj.category),
+        'tags': _tags(obj),
+        'is_featured': obj.is_featured,
+        'created_at': ctx.datetime(obj.created_at),
+    }
+
+
+def product_detail_dict(obj, ctx):
+    """ProductDetailSerializer output for one product"""
+    related = ProductListSerializer.setup_eager_loading(related_products(obj))
+    return {
+        'id': obj.id,
+        'name': obj.name,
+        'slug': obj.slug,
+        'description': obj.description,
+        'short_description': obj.short_description,
+        'price': _decimal(obj.price),
+        'original_price': _decimal(obj.original_price),
+        'discount_percentage': obj.discount_percentage,
+        'display_image': _display_image(obj, ctx),
+        'display_image_srcset': _display_image_srcset(obj, ctx),
+        'payment_qr': ctx.url(obj, 'payment_qr'),
+        'badge_text': obj.badge_text,
+        'features': obj.features,
+        'what_included': obj.what_included,
+        'perfect_for': obj.perfect_for,
+        'category': _category(obj.category),
+        'tags': _tags(obj),
+        'is_featured': obj.is_featured,
+        'created_at': ctx.datetime(obj.created_at),
+        'updated_at': ctx.datetime(obj.updated_at),
+        'related_products': [product_list_dict(product, ctx) for product in related],
+    }
+
+
+def order_detail_dict(obj, ctx):
+    """OrderDetailSerializer output for one order"""
+    return {
+        'id': obj.id,
+        'email': obj.email,
+        'phone': obj.phone,
+        'customer_name': obj.customer_name,
+        'product': product_list_dict(obj.product, ctx),
+        'quantity': obj.quantity,
+        'unit_price': _decimal(obj.unit_price),
+        'total_amount': _decimal(obj.total_amount),
+        'discount_amount': _decimal(obj.discount_amount),
+        'bump_offer_added': obj.bump_offer_added,
+        'bump_offer_price': _decimal(obj.bump_offer_price),
+        'status': obj.status,
+        'payment_id': obj.payment_id,
+        'payment_screenshot': ctx.url(obj, 'payment_screenshot'),
+        'download_link': obj.download_link,
+        'download_sent': obj.download_sent,
+        'created_at': ctx.datetime(obj.created_at),
+        'updated_at': ctx.datetime(obj.updated_at),
+    }
+
+
+class FastSerializer:
+    """
+    Read-only serializer building each row with `to_dict(obj, ctx)`.
+    `reference` is the DRF serializer it mirrors, which also declares the
+    relations to eager-load.
+    """
+    reference = None
+    to_dict = None
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return cls.reference.setup_eager_loading(queryset)
+
+    @property
+    def data(self):
+        ctx = ResponseContext(self.context.get('request'))
+        if self.many:
+            return ReturnList([self.to_dict(obj, ctx) for obj in self.instance], serializer=self)
+        return ReturnDict(self.to_dict(self.instance, ctx), serializer=self)
+
+
+class FastProductListSerializer(FastSerializer):
+    reference = ProductListSerializer
+    to_dict = staticmethod(product_list_dict)
+
+
+class FastProductDetailSerializer(FastSerializer):
+    reference = ProductDetailSerializer
+    to_dict = staticmethod(product_detail_dict)
+
+
+class FastOrderDetailSerializer(FastSerializer):
+    reference = OrderDetailSerializer
+    to_dict = staticmethod(order_detail_dict)
+
+
+FAST_SERIALIZERS = {
+    fast.reference: fast
+    for fast in (FastProductListSerializer, FastProductDetailSerializer, FastOrderDetailSerializer)
+}
+
+
+def fast_serializer_for(serializer_class, request):
+    """
+    The fast equivalent of `serializer_class` for a read rendered as JSON.
+    Writes and the browsable API (which builds forms from real serializer
+    fields) keep the DRF serializer.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    if request.method not in SAFE_METHODS or renderer is None or renderer.format != 'json':
+        return serializer_class
+    return FAST_SERIALIZERS.get(serializer_class, serializer_class)
@@ -0,0 +1,239 @@
+"""
+Responsive image derivatives.
+
+Uploaded images (product images and QR codes, the default payment QR and
+payment screenshots) are resized to the widths in IMAGE_DERIVATIVE_WIDTHS
+and saved as WebP and JPEG next to the original, under a `derivatives/`
+directory. Each image field has a `<field>_derivatives` JSON manifest:
+
+    {'source': 'products/a.png', 'width': 1600, 'height': 900,
+     'webp': [[160, 'products/derivatives/a-160w.webp'], ...],
+     'jpeg': [[160, 'products/derivatives/a-160w.jpg'], ...]}
+
+(with the names the storage actually saved them under, see storage.py).
+
+A manifest whose `source` isn't the field's current file is stale. Saving a
+model with a stale manifest schedules the resize after commit on a small
+thread pool (see signals.py), so uploads don't wait for Pillow; until it
+finishes, pages fall back to the original. Missing manifests can be built
+with `python manage.py build_image_derivatives`.
+"""
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .caching import bump_generations
+from .models import Order, Product, SiteSettings
+from .replicas import bump_catalog_version
+from .storage import is_content_addressed
+
+# Image fields with derivatives, per model
+IMAGE_FIELDS = {
+    Product: ('image', 'payment_qr'),
+    Order: ('payment_screenshot',),
+    SiteSettings: ('payment_qr_default',),
+}
+
+# Output formats, best first: (Pillow format, extension, save options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def manifest_field(field_name):
+    return f'{field_name}_derivatives'
+
+
+def get_manifest(instance, field_name):
+    """The field's manifest, or {} when it doesn't describe the current file"""
+    manifest = getattr(instance, manifest_field(field_name)) or {}
+    name = getattr(instance, field_name).name
+    if not name or manifest.get('source') != name:
+        return {}
+    return manifest
+
+
+def is_stale(instance, field_name):
+    name = getattr(instance, field_name).name or ''
+    manifest = getattr(instance, manifest_field(field_name)) or {}
+    return manifest.get('source', '') != name
+
+
+def _resize(image, width):
+    if width == image.width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _encode(image, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG has no alpha channel: flatten transparent images onto white
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.getchannel('A'))
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def build_derivatives(field_file):
+    """
+    Resize an image field's file to each configured width (never upscaled;
+    images narrower than every width get one copy at their own width) in
+    every format, save the copies through the field's storage and return
+    the manifest. Unreadable images get a manifest with an 'error', so they
+    aren't retried on every save.
+    """
+    name = field_file.name
+    storage = field_file.storage
+    try:
+        with storage.open(name, 'rb') as source:
+            image = Image.open(source)
+            # Apply the camera rotation; the copies carry no EXIF
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, Image.DecompressionBombError, SyntaxError) as exc:
+        print(f"Error reading image {name} for derivatives: {exc}")
+        return {'source': name, 'error': str(exc)}
+
+    widths = [width for width in sorted(settings.IMAGE_DERIVATIVE_WIDTHS) if width < image.width] or [image.width]
+    directory, filename = posixpath.split(name)
+    if is_content_addressed(name):
+        # The upload directory, not the hash shard under it
+        directory = posixpath.dirname(directory)
+    stem = posixpath.splitext(filename)[0]
+    manifest = {'source': name, 'width': image.width, 'height': image.height}
+    manifest.update({fmt: [] for fmt in FORMATS})
+    for width in widths:
+        resized = _resize(image, width)
+        for fmt, (_, extension, _) in FORMATS.items():
+            path = posixpath.join(directory, 'derivatives', f'{stem}-{width}w.{extension}')
+            saved = storage.save(path, ContentFile(_encode(resized, fmt)))
+            manifest[fmt].append([width, saved])
+    return manifest
+
+
+def delete_derivatives(manifest, storage):
+    for fmt in FORMATS:
+        for _, name in manifest.get(fmt, ()):
+            storage.delete(name)
+
+
+def srcset(urls):
+    """`srcset` attribute value from (width, url) pairs"""
+    return ', '.join(f'{url} {width}w' for width, url in urls)
+
+
+def derivative_urls(instance, field_name, fmt, url=None):
+    """
+    (width, url) pairs of a format's derivatives of an image field, smallest
+    first; [] when none are built yet. `url(storage, name)` builds the URLs
+    (storage.url() by default).
+    """
+    manifest = get_manifest(instance, field_name)
+    if not manifest.get(fmt):
+        return []
+    storage = instance._meta.get_field(field_name).storage
+    url = url or (lambda storage, name: storage.url(name))
+    return [(width, url(storage, name)) for width, name in manifest[fmt]]
+
+
+def smallest_derivative_url(instance, field_name, min_width=0):
+    """URL of the narrowest JPEG at least `min_width` wide, or of the original"""
+    urls = derivative_urls(instance, field_name, 'jpeg')
+    for width, url in urls:
+        if width >= min_width:
+            return url
+    return urls[-1][1] if urls else getattr(instance, field_name).url
+
+
+def _derivatives_changed(instance, using='default'):
+    """Drop cached pages and API responses showing the instance's images"""
+    if isinstance(instance, Product):
+        # Replicas without the new srcset aren't read from until they have it
+        bump_catalog_version(using)
+        bump_generations('catalog', f'product:{instance.slug}')
+    elif isinstance(instance, SiteSettings):
+        SiteSettings.invalidate_cache()
+        bump_generations('site')
+
+
+def update_derivatives(model, pk, field_names, using='default', force=False):
+    """
+    Build the derivatives of these image fields of one row if they are stale
+    (or always with `force`), and return the number of fields updated.
+    """
+    instance = model._default_manager.using(using).filter(pk=pk).first()
+    if instance is None:
+        return 0
+    updated = 0
+    for field_name in field_names:
+        field_file = getattr(instance, field_name)
+        if not force and not is_stale(instance, field_name):
+            continue
+        old = getattr(instance, manifest_field(field_name)) or {}
+        if field_file.name:
+            manifest = build_derivatives(field_file)
+            unchanged = Q(**{field_name: field_file.name})
+        else:
+            manifest = {}
+            unchanged = Q(**{field_name: ''}) | Q(**{f'{field_name}__isnull': True})
+        # Only if the image wasn't replaced meanwhile; the newer upload has
+        # its own job queued
+        saved = model._default_manager.using(using).filter(unchanged, pk=pk).update(
+            **{manifest_field(field_name): manifest}
+        )
+        if saved:
+            setattr(instance, manifest_field(field_name), manifest)
+            if old.get('source') is not None:
+                delete_derivatives(old, field_file.storage)
+            updated += 1
+        else:
+            delete_derivatives(manifest, field_file.storage)
+    if updated:
+        _derivatives_changed(instance, using)
+    return updated
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _run_in_worker(model, pk, field_names, using):
+    try:
+        update_derivatives(model, pk, field_names, using)
+    except Exception as exc:
+        print(f"Error building image derivatives for {model.__name__} {pk}: {exc}")
+    finally:
+        # Worker threads don't go through request_finished
+        connections[using].close()
+
+
+def schedule_derivatives(instance, field_names, using='default'):
+    """
+    Build the derivatives of these fields in the background. Call after the
+    row is committed; with IMAGE_DERIVATIVE_WORKERS = 0 they are built
+    inline instead.
+    """
+    global _executor
+    if settings.IMAGE_DERIVATIVE_WORKERS <= 0:
+        update_derivatives(type(instance), instance.pk, field_names, using)
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_DERIVATIVE_WORKERS, thread_name_prefix='image-derivatives',
+            )
+    _executor.submit(_run_in_worker, type(instance), instance.pk, tuple(field_names), using)
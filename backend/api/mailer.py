@@ -0,0 +1,135 @@
+"""
+Pooled email connections for queued and bulk sending.
+
+Opening an SMTP connection costs a TCP + TLS handshake and an AUTH round
+trip. The pool keeps a few authenticated connections open and hands them
+out to callers (admin bulk actions, email queue worker threads).
+"""
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+# Errors that mean the connection itself is gone; the message is retried
+# once on a fresh connection. Per-message SMTP errors are not retried.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class ConnectionPool:
+    """
+    A small pool of open email backend connections.
+
+    `size` bounds how many connections are open at once; callers block in
+    `connection()` until one is free. Connections idle for longer than
+    `idle_timeout` seconds are reopened before use, since SMTP servers drop
+    idle clients.
+    """
+
+    def __init__(self, backend=None, size=4, idle_timeout=60):
+        self.backend = backend
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn, last_used = self._idle.get_nowait()
+                if time.monotonic() - last_used > self.idle_timeout:
+                    conn.close()
+            except queue.Empty:
+                conn = get_connection(self.backend, fail_silently=False)
+            conn.open()  # no-op if already open
+
+            try:
+                yield conn
+            except Exception:
+                conn.close()
+                raise
+            self._idle.put((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def _send(self, conn, message):
+        try:
+            conn.open()  # reconnects after an earlier dropped connection
+            return conn.send_messages([message]) or 0
+        except RECONNECT_ERRORS:
+            conn.close()
+            conn.open()
+            return conn.send_messages([message]) or 0
+
+    def send_messages(self, messages, batch_size=None, fail_silently=False, failed=None):
+        """
+        Send messages over pooled connections, `batch_size` messages per
+        connection checkout. Returns the number of messages sent.
+
+        Messages are handed to the backend one at a time within a batch so a
+        dropped connection only retries the message that failed and never
+        re-sends the ones already delivered.
+
+        With `fail_silently`, errors (including failing to connect, which
+        skips the rest of the batch) are printed instead of raised, and the
+        messages not sent are appended to the `failed` list if given.
+        """
+        messages = list(messages)
+        batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        failed = [] if failed is None else failed
+        sent = 0
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            handled = 0
+            try:
+                with self.connection() as conn:
+                    for message in batch:
+                        try:
+                            sent += self._send(conn, message)
+                        except Exception as exc:
+                            if not fail_silently:
+                                raise
+                            print(f"Error sending email to {', '.join(message.to)}: {exc}")
+                            failed.append(message)
+                            if isinstance(exc, RECONNECT_ERRORS):
+                                conn.close()
+                        handled += 1
+            except Exception as exc:
+                if not fail_silently:
+                    raise
+                # The connection couldn't be opened
+                print(f"Error connecting to the email server: {exc}")
+                failed.extend(batch[handled:])
+        return sent
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """Return the process-wide pool for the configured EMAIL_BACKEND"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.backend != settings.EMAIL_BACKEND:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(
+                backend=settings.EMAIL_BACKEND,
+                size=settings.EMAIL_POOL_SIZE,
+                idle_timeout=settings.EMAIL_POOL_IDLE_TIMEOUT,
+            )
+        return _pool
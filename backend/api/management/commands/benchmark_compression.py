@@ -0,0 +1,82 @@
+"""
+Management command to measure the bytes sent for the main pages.
+
+Requests the storefront pages and catalog API responses through the full
+middleware stack, as a client without compression, with gzip and with
+brotli, then revalidates each with the validators it got back:
+
+    python manage.py benchmark_compression
+
+Only GET requests are made, against the configured database.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from api.middleware import brotli
+from api.models import Product
+
+ENCODINGS = (
+    ('identity', 'identity'),
+    ('gzip', 'gzip'),
+    ('br', 'br, gzip'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Report response sizes with and without compression, and of 304 revalidations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slug', help='Product for the product/checkout pages (default: the first active one)')
+        parser.add_argument('--host', default='localhost', help='Host header of the requests')
+
+    def handle(self, *args, **options):
+        slug = options['slug'] or Product.objects.filter(is_active=True).values_list('slug', flat=True).first()
+        if slug is None:
+            raise CommandError('No active products; run populate_initial_data or pass --slug')
+        product_id = Product.objects.filter(slug=slug).values_list('pk', flat=True).first()
+        if product_id is None:
+            raise CommandError(f'No product with slug {slug!r}')
+
+        pages = [
+            ('index', '/'),
+            ('product page', f'/product.html?slug={slug}'),
+            ('checkout page', f'/checkout.html?slug={slug}'),
+            ('product list API', '/api/products/'),
+            ('product detail API', f'/api/products/{product_id}/'),
+        ]
+        encodings = [encoding for encoding in ENCODINGS if encoding[0] != 'br' or brotli is not None]
+        client = Client(HTTP_HOST=options['host'])
+
+        self.stdout.write(
+            f"{'page':<20}" + ''.join(f'{name:>10}' for name, _ in encodings) + f"{'saved':>8}{'304':>8}"
+        )
+        for name, path in pages:
+            sizes = []
+            for _, accept in encodings:
+                response = client.get(path, HTTP_ACCEPT_ENCODING=accept)
+                if response.status_code != 200:
+                    raise CommandError(f'{path} returned {response.status_code}')
+                sizes.append(self._wire_size(response))
+
+            revalidate = {'HTTP_ACCEPT_ENCODING': encodings[-1][1]}
+            if response.has_header('ETag'):
+                revalidate['HTTP_IF_NONE_MATCH'] = response['ETag']
+            if response.has_header('Last-Modified'):
+                revalidate['HTTP_IF_MODIFIED_SINCE'] = response['Last-Modified']
+            revisit = client.get(path, **revalidate)
+            revisit_size = self._wire_size(revisit) if revisit.status_code == 304 else None
+
+            self.stdout.write(
+                f'{name:<20}' + ''.join(f'{size:>10,}' for size in sizes)
+                + f'{1 - sizes[-1] / sizes[0]:>8.0%}'
+                + (f'{revisit_size:>8,}' if revisit_size is not None else f"{'200':>8}")
+            )
+        self.stdout.write(self.style.SUCCESS('Sizes are bytes of headers and body as sent'))
+
+    @staticmethod
+    def _wire_size(response):
+        """Status line, headers and body, as an HTTP/1.1 server would send them"""
+        head = f'HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n'
+        head += ''.join(f'{header}: {value}\r\n' for header, value in response.items())
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return len((head + '\r\n').encode('latin-1')) + len(body)
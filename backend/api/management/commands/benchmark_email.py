@@ -0,0 +1,60 @@
+"""
+Management command to compare per-message and pooled email sending.
+
+Point the email settings at a local stand-in SMTP server, e.g.:
+
+    python -m aiosmtpd -n -l localhost:8025
+    EMAIL_BACKEND_TYPE=smtp EMAIL_HOST=localhost EMAIL_PORT=8025 EMAIL_USE_TLS=False \
+        python manage.py benchmark_email --count 500
+"""
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+
+from api.mailer import ConnectionPool
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sending N emails with a connection per message vs the connection pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500, help='Number of emails to send')
+        parser.add_argument('--to', default='benchmark@example.com', help='Recipient address')
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_BATCH_SIZE)
+        parser.add_argument('--pool-size', type=int, default=settings.EMAIL_POOL_SIZE)
+
+    def _messages(self, count, to):
+        return [
+            EmailMessage(
+                subject=f'Benchmark message {i}',
+                body='Benchmark body',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[to],
+            )
+            for i in range(count)
+        ]
+
+    def handle(self, *args, **options):
+        count = options['count']
+        self.stdout.write(f'Backend: {settings.EMAIL_BACKEND}')
+
+        # Baseline: what send_mail() does, one connection per message
+        messages = self._messages(count, options['to'])
+        start = time.perf_counter()
+        for message in messages:
+            get_connection(fail_silently=False).send_messages([message])
+        per_message = time.perf_counter() - start
+        self.stdout.write(f'Connection per message: {count} emails in {per_message:.2f}s')
+
+        messages = self._messages(count, options['to'])
+        pool = ConnectionPool(backend=settings.EMAIL_BACKEND, size=options['pool_size'])
+        start = time.perf_counter()
+        sent = pool.send_messages(messages, batch_size=options['batch_size'])
+        pooled = time.perf_counter() - start
+        pool.close()
+        self.stdout.write(f'Pooled connections:     {sent} emails in {pooled:.2f}s')
+
+        if pooled:
+            self.stdout.write(self.style.SUCCESS(f'Speedup: {per_message / pooled:.1f}x'))
@@ -0,0 +1,79 @@
+"""
+Management command to benchmark the orjson renderer/parser against DRF's.
+
+Uses the scratch database of benchmark_serializers (seeding it if needed)
+to build realistic product and order payloads, checks both renderers
+produce the same bytes, and reports throughput:
+
+    python manage.py benchmark_json
+"""
+import io
+import time
+
+from django.core.management.base import CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import FAST_SERIALIZERS
+from api.models import Order, Product
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import OrderDetailSerializer, ProductDetailSerializer, ProductListSerializer
+
+from . import benchmark_serializers
+
+
+class Command(benchmark_serializers.Command):
+    help = 'Compare the orjson JSON renderer/parser with DRF\'s on product and order payloads'
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed; FastJSONRenderer is using DRF\'s renderer')
+        self._setup_database(options)
+
+        context = {'request': None}
+        products = list(ProductListSerializer.setup_eager_loading(Product.objects.using(benchmark_serializers.ALIAS)))
+        orders = list(OrderDetailSerializer.setup_eager_loading(Order.objects.using(benchmark_serializers.ALIAS)))
+
+        def page(serializer_class, rows):
+            data = FAST_SERIALIZERS[serializer_class](rows, many=True, context=context).data
+            return {'count': len(rows), 'next': None, 'previous': None, 'results': data}
+
+        payloads = {
+            'product list page': page(ProductListSerializer, products[:20]),
+            'order list page': page(OrderDetailSerializer, orders[:20]),
+            'product detail': ProductDetailSerializer(products[0], context=context).data,
+            'order export (500)': page(OrderDetailSerializer, orders[:500]),
+            # Raw Decimal/datetime values, as returned by values()
+            'order rows (values)': list(Order.objects.using(benchmark_serializers.ALIAS).values()[:500]),
+        }
+
+        drf_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        drf_parser, fast_parser = JSONParser(), FastJSONParser()
+        self.stdout.write(
+            f"{'payload':<22}{'KB':>7}{'DRF render':>12}{'orjson':>10}{'speedup':>9}"
+            f"{'DRF parse':>12}{'orjson':>10}{'speedup':>9}"
+        )
+        for name, data in payloads.items():
+            expected = drf_renderer.render(data)
+            if fast_renderer.render(data) != expected:
+                raise CommandError(f'{name}: rendered JSON differs from DRF\'s renderer')
+            repeat = max(20, 2_000_000 // len(expected))
+            render = [self._rate(lambda: renderer.render(data), repeat) for renderer in (drf_renderer, fast_renderer)]
+            parse = [
+                self._rate(lambda: parser.parse(io.BytesIO(expected)), repeat)
+                for parser in (drf_parser, fast_parser)
+            ]
+            self.stdout.write(
+                f'{name:<22}{len(expected) / 1024:>7.1f}'
+                f'{render[0]:>10.3f}ms{render[1]:>8.3f}ms{render[0] / render[1]:>8.1f}x'
+                f'{parse[0]:>10.3f}ms{parse[1]:>8.3f}ms{parse[0] / parse[1]:>8.1f}x'
+            )
+        self.stdout.write(self.style.SUCCESS('Both renderers produce identical output'))
+
+    def _rate(self, run, repeat):
+        """CPU milliseconds per call"""
+        start = time.process_time()
+        for _ in range(repeat):
+            run()
+        return (time.process_time() - start) * 1000 / repeat
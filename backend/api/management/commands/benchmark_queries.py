@@ -0,0 +1,150 @@
+"""
+Management command to benchmark the API's catalog and order queries.
+
+Seeds a scratch SQLite database (never the configured one), then runs each
+endpoint's query with and without the indexes declared on Product and Order,
+printing timings and EXPLAIN QUERY PLAN output:
+
+    python manage.py benchmark_queries --products 100000 --orders 1000000
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.models import Category, Order, Product, Tag
+
+ALIAS = 'benchmark'
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Seed a scratch SQLite database and report query plans/timings with and without indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--orders', type=int, default=1000000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the fastest is reported')
+        parser.add_argument(
+            '--db-path', default=str(settings.BASE_DIR / 'benchmark.sqlite3'),
+            help='Scratch SQLite file, reused between runs if already seeded',
+        )
+
+    def handle(self, *args, **options):
+        connections.databases[ALIAS] = {
+            **connections.databases['default'],
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': options['db_path'],
+            # The stock backend; the primary's OPTIONS are for api.sqlite_backend
+            'OPTIONS': {},
+        }
+        call_command('migrate', database=ALIAS, verbosity=0)
+
+        if not Product.objects.using(ALIAS).exists():
+            self._seed(options)
+
+        queries = self._queries()
+        indexes = [(model, index) for model in (Product, Order) for index in model._meta.indexes]
+
+        with connections[ALIAS].schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        connections[ALIAS].cursor().execute('ANALYZE')
+        before = self._run(queries, options['repeat'], 'Without indexes')
+
+        with connections[ALIAS].schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        connections[ALIAS].cursor().execute('ANALYZE')
+        after = self._run(queries, options['repeat'], 'With indexes')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nSummary (ms)'))
+        self.stdout.write(f"{'query':<32}{'before':>10}{'after':>10}{'speedup':>10}")
+        for name in queries:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            self.stdout.write(f'{name:<32}{before[name]:>10.2f}{after[name]:>10.2f}{speedup:>9.1f}x')
+
+    def _seed(self, options):
+        self.stdout.write(f"Seeding {options['products']} products and {options['orders']} orders...")
+        rng = random.Random(42)
+
+        categories = Category.objects.using(ALIAS).bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}') for i in range(options['categories'])
+        )
+        Tag.objects.using(ALIAS).bulk_create(Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(50))
+
+        for start in range(0, options['products'], BATCH_SIZE):
+            Product.objects.using(ALIAS).bulk_create(
+                Product(
+                    name=f'Product {i}',
+                    slug=f'product-{i}',
+                    description='Benchmark product description ' * 10,
+                    price=Decimal(rng.randrange(49, 2000)),
+                    category=rng.choice(categories),
+                    is_active=rng.random() < 0.9,
+                    is_featured=rng.random() < 0.02,
+                )
+                for i in range(start, min(start + BATCH_SIZE, options['products']))
+            )
+        # auto_now_add overrides created_at on insert; spread it out again
+        connections[ALIAS].cursor().execute(
+            "UPDATE api_product SET created_at = datetime('now', '-' || id || ' minutes')"
+        )
+
+        product_ids = list(Product.objects.using(ALIAS).values_list('id', flat=True))
+        statuses = [choice for choice, _ in Order.ORDER_STATUS_CHOICES]
+        for start in range(0, options['orders'], BATCH_SIZE):
+            Order.objects.using(ALIAS).bulk_create(
+                Order(
+                    email=f'customer{rng.randrange(options["orders"] // 5 or 1)}@example.com',
+                    phone='9999999999',
+                    product_id=rng.choice(product_ids),
+                    unit_price=Decimal('149'),
+                    total_amount=Decimal('149'),
+                    status=rng.choice(statuses),
+                )
+                for _ in range(start, min(start + BATCH_SIZE, options['orders']))
+            )
+        connections[ALIAS].cursor().execute(
+            "UPDATE api_order SET created_at = datetime('now', '-' || id || ' seconds')"
+        )
+
+    def _queries(self):
+        products = Product.objects.using(ALIAS).filter(is_active=True).order_by('-created_at', '-id')
+        orders = Order.objects.using(ALIAS).order_by('-created_at', '-id')
+        cutoff = Order.objects.using(ALIAS).order_by('-created_at').values_list('created_at', flat=True)[
+            Order.objects.using(ALIAS).count() // 2
+        ]
+        return {
+            'products list': products[:20],
+            'products list page 500': products[10000:10020],
+            'products featured': products.filter(is_featured=True)[:20],
+            'products by_price': products.filter(price__gte=100, price__lte=150)[:20],
+            'products by_category': products.filter(category__slug='category-3')[:20],
+            'index price filter': products.filter(price=149),
+            'orders list': orders[:20],
+            'orders keyset deep page': orders.filter(created_at__lt=cutoff)[:20],
+            'orders by_email': orders.filter(email='customer42@example.com')[:20],
+            'orders by status': orders.filter(status='pending')[:20],
+        }
+
+    def _run(self, queries, repeat, title):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{title}'))
+        timings = {}
+        for name, queryset in queries.items():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            self.stdout.write(f'{name}: {best:.2f} ms')
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'    {line}')
+        return timings
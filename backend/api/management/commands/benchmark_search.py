@@ -0,0 +1,96 @@
+"""
+Management command to benchmark product search.
+
+Seeds a scratch SQLite database (never the configured one) with generated
+product copy and compares the full-text index behind `?q=` with the
+`LIKE '%term%'` scans behind `?search=`:
+
+    python manage.py benchmark_search --products 50000
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.models import Product
+from api.search import SearchBackend, get_search_backend, search_products, search_terms
+
+ALIAS = 'benchmark_search'
+BATCH_SIZE = 2000
+WORDS = (
+    'python django excel marketing design photoshop course bundle template guide '
+    'beginner advanced masterclass finance budget planner notion resume interview '
+    'video editing canva instagram youtube growth sales copywriting email freelancing '
+    'data analysis sql dashboard power productivity habits journal ebook workbook'
+).split()
+# Filler vocabulary, so a search term matches a realistic share of the catalog
+FILLER = [f'{a}{b}{c}' for a in 'bcdfghklmnprstvz' for b in 'aeiou' for c in ('lo', 'ra', 'tin', 'vex', 'dom')]
+QUERIES = ['excel', 'python course', 'video edit', 'notion planner template', 'masterclass', 'zzz']
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text product search with LIKE scans on a seeded scratch database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the fastest is reported')
+        parser.add_argument(
+            '--db-path', default=str(settings.BASE_DIR / 'benchmark_search.sqlite3'),
+            help='Scratch SQLite file, reused between runs if already seeded',
+        )
+
+    def handle(self, *args, **options):
+        connections.databases[ALIAS] = {
+            **connections.databases['default'],
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': options['db_path'],
+            # The stock backend; the primary's OPTIONS are for api.sqlite_backend
+            'OPTIONS': {},
+        }
+        call_command('migrate', database=ALIAS, verbosity=0)
+
+        if not Product.objects.using(ALIAS).exists():
+            self._seed(options['products'])
+
+        products = Product.objects.using(ALIAS).filter(is_active=True)
+        self.stdout.write(f"{'query':<28}{'matches':>9}{'LIKE ms':>10}{'index ms':>10}{'speedup':>10}")
+        for query in QUERIES:
+            # The base backend does what SearchFilter does for ?search=
+            like = SearchBackend().search(products, search_terms(query)).order_by('-created_at', '-id')
+            indexed = search_products(products, query)
+            like_ms = self._time(lambda: (like.count(), list(like[:20])), options['repeat'])
+            index_ms = self._time(lambda: (indexed.count(), list(indexed[:20])), options['repeat'])
+            self.stdout.write(
+                f'{query:<28}{indexed.count():>9}{like_ms:>10.2f}{index_ms:>10.2f}{like_ms / index_ms:>9.1f}x'
+            )
+
+    def _seed(self, count):
+        self.stdout.write(f'Seeding {count} products...')
+        rng = random.Random(42)
+        for start in range(0, count, BATCH_SIZE):
+            Product.objects.using(ALIAS).bulk_create(
+                Product(
+                    name=' '.join(rng.choices(WORDS, k=3)).title(),
+                    slug=f'product-{i}',
+                    short_description=' '.join(rng.choices(FILLER, k=15) + rng.choices(WORDS, k=1)),
+                    description=' '.join(rng.choices(FILLER, k=300) + rng.choices(WORDS, k=2)),
+                    price=Decimal(rng.randrange(49, 2000)),
+                    is_active=rng.random() < 0.9,
+                )
+                for i in range(start, min(start + BATCH_SIZE, count))
+            )
+        # bulk_create skips the signals that keep the index in sync
+        get_search_backend(ALIAS).rebuild(Product, ALIAS)
+
+    def _time(self, run, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,164 @@
+"""
+Management command to benchmark the fast read serializers against DRF's.
+
+Seeds a scratch SQLite database (never the configured one), renders product
+list/detail and order detail responses with both implementations and
+reports the time per response:
+
+    python manage.py benchmark_serializers --verify
+
+`--verify` fails if any rendered JSON differs byte for byte.
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.fast_serializers import FAST_SERIALIZERS
+from api.models import Category, Order, Product, Tag
+from api.related import rebuild_related
+from api.serializers import OrderDetailSerializer, ProductDetailSerializer, ProductListSerializer
+
+ALIAS = 'benchmark_serializers'
+
+
+class Command(BaseCommand):
+    help = 'Compare fast and DRF serializers for speed and identical output'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=50, help='Responses rendered per measurement')
+        parser.add_argument('--verify', action='store_true', help='Fail if any output differs')
+        parser.add_argument(
+            '--db-path', default=str(settings.BASE_DIR / 'benchmark_serializers.sqlite3'),
+            help='Scratch SQLite file, reused between runs if already seeded',
+        )
+
+    def handle(self, *args, **options):
+        self._setup_database(options)
+
+        request = Request(APIRequestFactory().get('/api/products/', HTTP_HOST='shop.example.com'))
+        context = {'request': request}
+        renderer = JSONRenderer()
+        page_size = options['page_size']
+
+        products = list(ProductListSerializer.setup_eager_loading(Product.objects.using(ALIAS).all()))
+        orders = list(OrderDetailSerializer.setup_eager_loading(Order.objects.using(ALIAS).all()))
+        cases = [
+            ('product list page', ProductListSerializer, [products[i:i + page_size] for i in range(0, len(products), page_size)], True),
+            ('order list page', OrderDetailSerializer, [orders[i:i + page_size] for i in range(0, len(orders), page_size)], True),
+            ('product detail', ProductDetailSerializer, products[:50], False),
+        ]
+
+        mismatches = 0
+        self.stdout.write(f"{'response':<20}{'DRF ms':>10}{'fast ms':>10}{'speedup':>10}")
+        for name, serializer_class, items, many in cases:
+            fast_class = FAST_SERIALIZERS[serializer_class]
+            if options['verify']:
+                for item in items:
+                    expected = renderer.render(serializer_class(item, many=many, context=context).data)
+                    actual = renderer.render(fast_class(item, many=many, context=context).data)
+                    if expected != actual:
+                        mismatches += 1
+                        self.stderr.write(f'{name} differs:\n  DRF:  {expected[:500]!r}\n  fast: {actual[:500]!r}')
+            if name == 'product detail':
+                # Related products are a query per detail; time the serializer alone
+                items = items[:5]
+            drf_ms = self._time(serializer_class, items, many, context, options['repeat'])
+            fast_ms = self._time(fast_class, items, many, context, options['repeat'])
+            self.stdout.write(f'{name:<20}{drf_ms:>10.3f}{fast_ms:>10.3f}{drf_ms / fast_ms:>9.1f}x')
+
+        if mismatches:
+            raise CommandError(f'{mismatches} response(s) differ between the DRF and fast serializers')
+        if options['verify']:
+            self.stdout.write(self.style.SUCCESS('All responses are byte-identical'))
+
+    def _setup_database(self, options):
+        connections.databases[ALIAS] = {
+            **connections.databases['default'],
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': options['db_path'],
+            # The stock backend; the primary's OPTIONS are for api.sqlite_backend
+            'OPTIONS': {},
+        }
+        call_command('migrate', database=ALIAS, verbosity=0)
+        if not Product.objects.using(ALIAS).exists():
+            self._seed(options['products'])
+
+    def _time(self, serializer_class, items, many, context, repeat):
+        """Milliseconds per response (serializing only, rows already loaded)"""
+        start = time.process_time()
+        for _ in range(repeat):
+            for item in items:
+                serializer_class(item, many=many, context=context).data
+        return (time.process_time() - start) * 1000 / (repeat * len(items))
+
+    def _seed(self, count):
+        self.stdout.write(f'Seeding {count} products and {count * 2} orders...')
+        rng = random.Random(42)
+        db = Product.objects.using(ALIAS)
+        categories = Category.objects.using(ALIAS).bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}', description=f'About category {i}') for i in range(5)
+        )
+        tags = Tag.objects.using(ALIAS).bulk_create(Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(10))
+        db.bulk_create(
+            Product(
+                name=f'Product {i}',
+                slug=f'product-{i}',
+                description='Description ' * 20,
+                short_description=f'Short description {i}',
+                price=Decimal(rng.randrange(4900, 200000)) / 100,
+                original_price=rng.choice([None, Decimal('2999'), Decimal('4999.5')]),
+                discount_percentage=rng.randrange(0, 80),
+                # File names with spaces/unicode exercise URL quoting
+                image=rng.choice(['', f'products/image {i}.jpg', f'products/ümlaut-{i}.png']),
+                image_url=rng.choice(['', f'https://cdn.example.com/{i}.jpg']),
+                payment_qr=rng.choice(['', f'payment_qr/qr-{i}.png']),
+                badge_text=rng.choice(['', 'Bestseller']),
+                category=rng.choice(categories + [None]),
+                features=['Feature one', 'Feature two'],
+                what_included=[{'title': 'Item', 'count': 3}],
+                is_featured=rng.random() < 0.1,
+            )
+            for i in range(count)
+        )
+        products = list(db.all())
+        for product in products:
+            if product.image and rng.random() < 0.5:
+                stem = product.image.name.rsplit('.', 1)[0].replace('products/', 'products/derivatives/')
+                product.image_derivatives = {
+                    'source': product.image.name, 'width': 1200, 'height': 800,
+                    'webp': [[width, f'{stem}-{width}w.webp'] for width in (160, 320, 640, 1024)],
+                    'jpeg': [[width, f'{stem}-{width}w.jpg'] for width in (160, 320, 640, 1024)],
+                }
+        db.bulk_update(products, ['image_derivatives'])
+        Product.tags.through.objects.using(ALIAS).bulk_create(
+            Product.tags.through(product_id=product.id, tag_id=tag.id)
+            for product in products
+            for tag in rng.sample(tags, rng.randrange(0, 4))
+        )
+        Order.objects.using(ALIAS).bulk_create(
+            Order(
+                email=f'customer{i}@example.com',
+                phone='9999999999',
+                customer_name=rng.choice(['', f'Customer {i}']),
+                product=rng.choice(products),
+                unit_price=Decimal('149'),
+                total_amount=Decimal('198.5'),
+                bump_offer_added=rng.random() < 0.3,
+                bump_offer_price=rng.choice([None, Decimal('49.50')]),
+                status=rng.choice([choice for choice, _ in Order.ORDER_STATUS_CHOICES]),
+                payment_screenshot=rng.choice(['', f'payment_screenshots/shot {i}.jpg']),
+            )
+            for i in range(count * 2)
+        )
+        # bulk_create skips the signals that fill the related products index
+        rebuild_related(using=ALIAS)
@@ -0,0 +1,110 @@
+"""
+Management command to benchmark page rendering with and without the
+cached template loader.
+
+Renders the storefront pages and the emails from the first active product
+(and order) in the configured database, reading nothing but that, with a
+template engine that loads and parses templates on every render and with
+one that keeps them compiled (the TEMPLATES setting), and reports the
+time per render:
+
+    python manage.py benchmark_templates
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Engine, engines
+
+from api.email_rendering import renderer
+from api.models import Order, Product, SiteSettings
+from api.related import related_products
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare render times of the main pages and emails with and without the cached template loader'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Renders per measurement')
+
+    def handle(self, *args, **options):
+        product = Product.objects.filter(is_active=True).select_related('category').first()
+        if product is None:
+            raise CommandError('No active products; run populate_initial_data first')
+        order = Order.objects.filter(product=product).first() or Order(
+            product=product, email='customer@example.com', phone='9999999999',
+            unit_price=product.price, total_amount=product.price,
+        )
+        pages = self._pages(product, order)
+
+        engines_to_compare = [self._engine(cached=False), self._engine(cached=True)]
+        repeat = options['repeat']
+        self.stdout.write(f"{'template':<34}{'uncached':>12}{'cached':>12}{'speedup':>9}")
+        for name, context in pages:
+            timings = [self._time(engine, name, context, repeat) for engine in engines_to_compare]
+            self.stdout.write(
+                f'{name:<34}{timings[0]:>10.3f}ms{timings[1]:>10.3f}ms{timings[0] / timings[1]:>8.1f}x'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Milliseconds per render, best of 3 runs of {repeat}'))
+
+    def _pages(self, product, order):
+        products = list(Product.objects.filter(is_active=True)[:settings.INDEX_PAGE_SIZE])
+        email_context = {**renderer.site_context(), 'order': order, 'product': product}
+        return [
+            ('index.html', {
+                'products': products,
+                'next_offset': settings.INDEX_PAGE_SIZE,
+                # Render the cards every time rather than from the fragment cache
+                'card_cache_timeout': 0,
+            }),
+            ('product.html', {
+                'product': product,
+                'related_products': related_products(product),
+                'category': product.category,
+                'tags': list(product.tags.all()),
+            }),
+            ('checkout.html', {'product': product}),
+            ('payment.html', {
+                'product': product,
+                'email': order.email,
+                'phone': order.phone,
+                'total_amount': float(product.price),
+                'subtotal': float(product.price),
+                'site_settings': SiteSettings.load(),
+            }),
+            ('success.html', {'order': order, 'product': product}),
+            ('emails/order_confirmation.html', email_context),
+            ('emails/order_confirmation.txt', email_context),
+            ('emails/payment_verified.html', email_context),
+            ('emails/download_link.html', email_context),
+        ]
+
+    def _engine(self, cached):
+        """An engine like the configured one, with or without the cached loader"""
+        configured = engines['django'].engine
+        loaders = [('django.template.loaders.cached.Loader', LOADERS)] if cached else LOADERS
+        return Engine(
+            dirs=configured.dirs,
+            loaders=loaders,
+            context_processors=configured.context_processors,
+            string_if_invalid=configured.string_if_invalid,
+            file_charset=configured.file_charset,
+            libraries=configured.libraries,
+            autoescape=configured.autoescape,
+        )
+
+    def _time(self, engine, name, context, repeat):
+        engine.get_template(name).render(Context(context))  # warm up (and fill the cache)
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                engine.get_template(name).render(Context(context))
+            elapsed = (time.perf_counter() - start) * 1000 / repeat
+            best = elapsed if best is None else min(best, elapsed)
+        return best
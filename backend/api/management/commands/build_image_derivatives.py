@@ -0,0 +1,30 @@
+"""
+Management command to build the resized copies of uploaded images
+"""
+from django.core.management.base import BaseCommand
+
+from api.images import IMAGE_FIELDS, is_stale, manifest_field, update_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Build missing responsive image derivatives (e.g. for images uploaded before they existed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--force', action='store_true', help='Rebuild every image, e.g. after changing the widths')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        updated = 0
+        for model, field_names in IMAGE_FIELDS.items():
+            rows = model._default_manager.using(using).only(
+                'pk', *field_names, *[manifest_field(field_name) for field_name in field_names]
+            )
+            for row in rows.iterator():
+                stale = [
+                    field_name for field_name in field_names
+                    if is_stale(row, field_name) or (options['force'] and getattr(row, field_name).name)
+                ]
+                if stale:
+                    updated += update_derivatives(model, row.pk, stale, using, force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f'Built derivatives for {updated} image(s)'))
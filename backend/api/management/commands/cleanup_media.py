@@ -0,0 +1,102 @@
+"""
+Management command to remove unreferenced content-addressed media
+"""
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.images import FORMATS, IMAGE_FIELDS, manifest_field
+from api.models import MediaBlob
+from api.storage import is_content_addressed
+
+
+class Command(BaseCommand):
+    help = 'Recount media references and delete blobs unreferenced for longer than the grace period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes', type=int, default=60,
+            help='Keep unreferenced blobs saved more recently than this (uploads not yet committed)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report without deleting or recounting')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        dry_run = options['dry_run']
+        referenced = self._count_references()
+
+        recounted = deleted = freed = 0
+        for blob in MediaBlob.objects.order_by('pk').iterator():
+            count = referenced.get(blob.name, 0)
+            if count != blob.ref_count:
+                recounted += 1
+                if not dry_run:
+                    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=count)
+            if count or blob.last_saved_at >= cutoff:
+                continue
+            if dry_run or self._delete_blob(blob, cutoff):
+                deleted += 1
+                freed += blob.size
+
+        # Files left by uploads whose transaction rolled back have no row
+        known = set(MediaBlob.objects.values_list('name', flat=True))
+        for name, path in self._stored_files():
+            if name in known or referenced.get(name):
+                continue
+            if os.path.getmtime(path) >= cutoff.timestamp():
+                continue
+            size = os.path.getsize(path)
+            if not dry_run:
+                os.remove(path)
+            deleted += 1
+            freed += size
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted} blob(s), {freed / 1024 / 1024:.1f} MB; {recounted} reference count(s) corrected'
+        ))
+
+    def _count_references(self):
+        """Rows (and their resized copies) referencing each stored name"""
+        referenced = Counter()
+        for model, field_names in IMAGE_FIELDS.items():
+            manifests = [manifest_field(field_name) for field_name in field_names]
+            for row in model._default_manager.values_list(*field_names, *manifests).iterator():
+                referenced.update(name for name in row[:len(field_names)] if name)
+                for manifest in row[len(field_names):]:
+                    referenced.update(name for fmt in FORMATS for _, name in (manifest or {}).get(fmt, ()))
+        return referenced
+
+    def _delete_blob(self, blob, cutoff):
+        """
+        Delete an unreferenced blob unless a save revived it meanwhile. The
+        file is moved aside first, so a save that finds it missing writes it
+        again, and moved back if the row turned out to be in use.
+        """
+        path = default_storage.path(blob.name)
+        trash = f'{path}.deleting'
+        try:
+            os.replace(path, trash)
+        except FileNotFoundError:
+            trash = None
+        deleted, _ = MediaBlob.objects.filter(pk=blob.pk, ref_count=0, last_saved_at__lt=cutoff).delete()
+        if trash is None:
+            return bool(deleted)
+        if deleted or os.path.exists(path):
+            os.remove(trash)
+        else:
+            os.replace(trash, path)
+        return bool(deleted)
+
+    def _stored_files(self):
+        root = default_storage.location
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                if is_content_addressed(name):
+                    yield name, path
@@ -0,0 +1,154 @@
+"""
+Management command to load test concurrent checkouts on SQLite.
+
+Creates a scratch SQLite file (never the configured database) per backend,
+then runs processes posting orders to /api/orders/ alongside ones reading
+the catalog API and homepage (uncached, so they hit the database), and
+reports throughput and "database is locked" errors. Compares Django's
+stock SQLite backend (rollback journal, deferred transactions, 5 s busy
+timeout) with api.sqlite_backend as configured in settings:
+
+    python manage.py loadtest_orders --writers 8 --readers 8 --seconds 10
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from api.models import Category, Product
+
+BACKENDS = {
+    'stock': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+    'tuned': {
+        'ENGINE': 'api.sqlite_backend',
+        'OPTIONS': {'timeout': 20, 'transaction_mode': 'IMMEDIATE'},
+    },
+}
+
+READ_PATHS = ('/api/products/', '/')
+
+
+class Command(BaseCommand):
+    help = 'Fire parallel order creates and catalog reads at scratch SQLite databases and report lock errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Processes creating orders')
+        parser.add_argument('--readers', type=int, default=8, help='Processes reading the catalog')
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--backend', choices=[*BACKENDS, 'both'], default='both')
+        parser.add_argument(
+            '--db-path', default=str(settings.BASE_DIR / 'loadtest.sqlite3'),
+            help='Scratch SQLite file, recreated for each backend',
+        )
+
+    def handle(self, *args, **options):
+        backends = list(BACKENDS) if options['backend'] == 'both' else [options['backend']]
+        configured = BACKENDS['tuned']
+        if settings.DATABASES[DEFAULT_DB_ALIAS]['ENGINE'] == 'api.sqlite_backend':
+            configured = {'ENGINE': 'api.sqlite_backend', 'OPTIONS': settings.DATABASES[DEFAULT_DB_ALIAS]['OPTIONS']}
+
+        self.stdout.write(
+            f"{'backend':<8}{'orders/s':>10}{'reads/s':>10}{'locked':>8}{'other errors':>14}"
+        )
+        # Pages and API responses uncached, image work inline: every request hits SQLite
+        with override_settings(PAGE_CACHE_TIMEOUT=0, API_CACHE_TIMEOUT=0, IMAGE_DERIVATIVE_WORKERS=0):
+            for name in backends:
+                backend = configured if name == 'tuned' else BACKENDS[name]
+                self._use_database(backend, options['db_path'])
+                counts = self._run(options)
+                seconds = options['seconds']
+                self.stdout.write(
+                    f"{name:<8}{counts['order'] / seconds:>10.1f}{counts['read'] / seconds:>10.1f}"
+                    f"{counts['locked']:>8}{counts['error']:>14}"
+                )
+        connections.close_all()
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def _use_database(self, backend, path):
+        """Point the default connection of every thread at a fresh scratch file"""
+        connections.close_all()
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        database = connections.settings[DEFAULT_DB_ALIAS]
+        database.update(NAME=path, ENGINE=backend['ENGINE'], OPTIONS=dict(backend['OPTIONS']))
+        # Rebuilt from the settings above on next use
+        del connections[DEFAULT_DB_ALIAS]
+        call_command('migrate', verbosity=0)
+
+        category = Category.objects.create(name='Load test', slug='load-test')
+        Product.objects.bulk_create([
+            Product(
+                name=f'Load test product {i}', slug=f'load-test-{i}', description='Load test',
+                price=Decimal(99 + i), category=category,
+            )
+            for i in range(30)
+        ])
+        connections.close_all()
+
+    def _run(self, options):
+        deadline = time.monotonic() + options['seconds']
+        product_ids = list(Product.objects.values_list('pk', flat=True))
+        connections.close_all()
+
+        # Separate processes, like the workers of a WSGI server (threads where
+        # fork isn't available); each has its own connection
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            results = context.Queue()
+            workers = [
+                context.Process(target=_worker, args=(i, write, product_ids, deadline, results))
+                for write, number in ((True, options['writers']), (False, options['readers']))
+                for i in range(number)
+            ]
+        else:
+            results = queue.Queue()
+            workers = [
+                threading.Thread(target=_worker, args=(i, write, product_ids, deadline, results))
+                for write, number in ((True, options['writers']), (False, options['readers']))
+                for i in range(number)
+            ]
+        for worker in workers:
+            worker.start()
+        counts = Counter()
+        for _ in workers:
+            counts.update(results.get())
+        for worker in workers:
+            worker.join()
+        return counts
+
+
+def _worker(index, write, product_ids, deadline, results):
+    """Create orders or read pages until the deadline; put the outcome counts on `results`"""
+    client = Client()
+    counts = Counter()
+    n = 0
+    try:
+        while time.monotonic() < deadline:
+            n += 1
+            try:
+                if write:
+                    response = client.post('/api/orders/', {
+                        'product': product_ids[n % len(product_ids)],
+                        'email': f'load{index}-{n}@example.com',
+                        'phone': '9999999999',
+                    })
+                    counts['order' if response.status_code == 201 else 'error'] += 1
+                else:
+                    response = client.get(READ_PATHS[n % len(READ_PATHS)])
+                    counts['read' if response.status_code == 200 else 'error'] += 1
+            except OperationalError as exc:
+                counts['locked' if 'locked' in str(exc) else 'error'] += 1
+    finally:
+        connections.close_all()
+        results.put(dict(counts))
@@ -0,0 +1,55 @@
+"""
+Management command to drain the outbound email queue
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.email_queue import process_queue
+
+
+class Command(BaseCommand):
+    help = 'Send queued order/payment emails using a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.EMAIL_QUEUE_WORKERS,
+            help='Number of worker threads sending emails in parallel',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Maximum number of emails claimed per polling round',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help='Seconds to sleep when the queue is empty',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the currently due emails and exit instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size']
+        self.stdout.write(self.style.SUCCESS(f'Email queue worker started ({workers} threads)'))
+
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = process_queue(workers=workers, batch_size=batch_size)
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent}, failed {failed}')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Email queue worker stopped: {total_sent} sent, {total_failed} failed'
+        ))
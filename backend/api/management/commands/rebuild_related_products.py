@@ -0,0 +1,14 @@
+"""
+Management command to rebuild the related products index
+"""
+from django.core.management.base import BaseCommand
+
+from api.related import rebuild_related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed related products for every product'
+
+    def handle(self, *args, **options):
+        changed = rebuild_related()
+        self.stdout.write(self.style.SUCCESS(f'Related products updated for {len(changed)} product(s)'))
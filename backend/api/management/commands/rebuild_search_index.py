@@ -0,0 +1,20 @@
+"""
+Management command to rebuild the product search index
+"""
+from django.core.management.base import BaseCommand
+
+from api.models import Product
+from api.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Reindex every product for full-text search (e.g. after bulk imports or queryset.update())'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        backend = get_search_backend(using)
+        count = backend.rebuild(Product, using)
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt ({type(backend).__name__}, {count} product(s))'))
@@ -0,0 +1,133 @@
+"""
+Management command to check a deployment before it takes traffic.
+
+Runs Django's system checks (with the deployment checks under the prod
+profile) and verifies the database, read replicas, migrations, cache,
+templates, static files and media directory the active settings point at:
+
+    DJANGO_ENV=prod python manage.py selfcheck
+
+Exits with an error if anything is broken; warnings don't fail it.
+"""
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError, SystemCheckError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from api.replicas import catalog_version, replica_versions
+from api.template_warmup import compile_templates
+
+
+class Command(BaseCommand):
+    help = 'Verify the settings, database, cache, templates and files of this deployment'
+
+    def handle(self, *args, **options):
+        self.failures = 0
+        profile = getattr(settings, 'DJANGO_ENV', 'dev')
+        production = profile == 'prod'
+        self._report('OK', 'profile', f'{profile} (DEBUG={settings.DEBUG})')
+        if production and settings.DEBUG:
+            self._report('FAIL', 'profile', 'DEBUG is on under the prod profile')
+
+        for name, check in (
+            ('system checks', lambda: self._system_checks(production)),
+            ('database', self._database),
+            ('replicas', self._replicas),
+            ('migrations', self._migrations),
+            ('cache', lambda: self._cache(production)),
+            ('templates', self._templates),
+            ('static files', lambda: self._static_files(production)),
+            ('media', self._media),
+        ):
+            try:
+                status, message = check()
+            except Exception as exc:
+                status, message = 'FAIL', f'{type(exc).__name__}: {exc}'
+            self._report(status, name, message)
+
+        if self.failures:
+            raise CommandError(f'{self.failures} check(s) failed')
+        self.stdout.write(self.style.SUCCESS('Ready to serve'))
+
+    def _report(self, status, name, message):
+        style = {'OK': self.style.SUCCESS, 'WARN': self.style.WARNING, 'FAIL': self.style.ERROR}[status]
+        if status == 'FAIL':
+            self.failures += 1
+        self.stdout.write(f'{style(status.ljust(4))} {name}: {message}')
+
+    def _system_checks(self, production):
+        try:
+            call_command('check', deploy=production, fail_level='ERROR', stdout=self.stdout, stderr=self.stderr)
+        except SystemCheckError as exc:
+            return 'FAIL', str(exc).strip().splitlines()[0]
+        return 'OK', 'deployment checks included' if production else 'passed'
+
+    def _database(self):
+        connection = connections[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        persistence = 'persistent connections off' if not max_age else f'connections kept {max_age}s'
+        return 'OK', f'{connection.vendor} {connection.settings_dict["NAME"]} ({persistence})'
+
+    def _replicas(self):
+        if not settings.DATABASE_REPLICAS:
+            return 'OK', 'none configured'
+        primary = catalog_version(DEFAULT_DB_ALIAS)
+        states = []
+        for alias, version in replica_versions().items():
+            if version is None:
+                states.append(f'{alias} unreachable')
+            elif version < primary:
+                states.append(f'{alias} behind ({version} of {primary} catalog changes)')
+        if states:
+            # The router falls back to the primary, so pages stay correct
+            return 'WARN', '; '.join(states) + '; catalog reads go to the primary'
+        return 'OK', f"{', '.join(settings.DATABASE_REPLICAS)} in sync"
+
+    def _migrations(self):
+        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if plan:
+            return 'FAIL', f'{len(plan)} unapplied; run python manage.py migrate'
+        return 'OK', 'all applied'
+
+    def _cache(self, production):
+        key = f'selfcheck:{uuid.uuid4().hex}'
+        cache.set(key, 'ok', 30)
+        value = cache.get(key)
+        cache.delete(key)
+        if value != 'ok':
+            return 'FAIL', 'a value written to the cache could not be read back'
+        backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+        if production and backend == 'LocMemCache':
+            return 'WARN', 'LocMemCache is per process; set REDIS_URL when running several workers'
+        return 'OK', backend
+
+    def _templates(self):
+        compiled, errors = compile_templates()
+        if errors:
+            return 'FAIL', '; '.join(f'{name}: {error}' for name, error in errors)
+        return 'OK', f'{compiled} compiled'
+
+    def _static_files(self, production):
+        manifest = os.path.join(settings.STATIC_ROOT, getattr(staticfiles_storage, 'manifest_name', ''))
+        if os.path.isfile(manifest):
+            return 'OK', f'collected in {settings.STATIC_ROOT}'
+        message = 'not collected; run python manage.py collectstatic'
+        return ('FAIL' if production else 'WARN'), message
+
+    def _media(self):
+        root = str(settings.MEDIA_ROOT)
+        if not os.path.isdir(root):
+            return 'WARN', f'{root} does not exist yet (created on the first upload)'
+        if not os.access(root, os.W_OK):
+            return 'FAIL', f'{root} is not writable'
+        return 'OK', root
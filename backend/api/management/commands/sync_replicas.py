@@ -0,0 +1,63 @@
+"""
+Management command to copy the SQLite database to its read replicas.
+
+For running the replica router (api/replicas.py) locally: each file in
+SQLITE_REPLICA_PATHS is replaced by a consistent snapshot of the primary,
+taken with SQLite's online backup, so the site can keep serving meanwhile.
+MySQL replicas are kept in sync by MySQL replication instead.
+
+    SQLITE_REPLICA_PATHS=replica.sqlite3 python manage.py sync_replicas
+    SQLITE_REPLICA_PATHS=replica.sqlite3 python manage.py sync_replicas --interval 5
+"""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.replicas import catalog_version, replica_versions
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite database to the replicas in SQLITE_REPLICA_PATHS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep copying every this many seconds (default: copy once)',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas configured; set SQLITE_REPLICA_PATHS')
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas can be synced; MySQL replicas use replication')
+
+        while True:
+            self._sync()
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _sync(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        version = catalog_version(DEFAULT_DB_ALIAS)
+        for alias in settings.DATABASE_REPLICAS:
+            path = connections[alias].settings_dict['NAME']
+            started = time.perf_counter()
+            target = sqlite3.connect(path)
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(
+                f'{alias}: copied to {path} in {(time.perf_counter() - started) * 1000:.0f} ms '
+                f'(catalog version {version})'
+            )
+        behind = [alias for alias, replica in replica_versions().items() if replica is None or replica < version]
+        if behind:
+            self.stdout.write(self.style.WARNING(f"Behind the primary: {', '.join(behind)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('Replicas in sync'))
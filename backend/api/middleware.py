@@ -0,0 +1,138 @@
+"""
+Response compression and conditional GET.
+
+CompressionMiddleware compresses text responses (HTML pages, JSON, CSS and
+JS served by Django) with brotli when the client accepts it and the
+`brotli` package is installed, else gzip. Small bodies and binary content
+types (images, which are already compressed) are passed through; streaming
+responses are compressed chunk by chunk as they are sent.
+
+ConditionalGetMiddleware gives GET responses that have no ETag of their own
+a weak one from a fast hash of the body and answers matching revalidations
+with 304. Views that know when their data last changed answer them before
+rendering instead (see caching.serve_cached()).
+"""
+import hashlib
+
+from django.conf import settings
+from django.middleware.http import ConditionalGetMiddleware as DjangoConditionalGetMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from .static_assets import accepted_encodings, brotli
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+def _content_type(response):
+    return response.get('Content-Type', '').partition(';')[0].strip().lower()
+
+
+def _brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    gzip/brotli for text responses of at least COMPRESSION_MIN_SIZE bytes.
+
+    Like Django's GZipMiddleware, gzip output is padded with a few random
+    bytes against BREACH, and brotli (which has no such padding) is not used
+    for responses that vary on the session cookie, as they may reflect
+    secrets such as the CSRF token.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+        if _content_type(response) not in COMPRESSIBLE_CONTENT_TYPES:
+            return response
+        if response.streaming:
+            if response.is_async:
+                # Compressing an async iterator needs an async middleware
+                return response
+        elif len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        # Whether compressed or not, the response varies on the header
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self._choose_encoding(request, response)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                response.streaming_content = _brotli_sequence(
+                    response.streaming_content, settings.COMPRESSION_BROTLI_QUALITY,
+                )
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=100)
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=100)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed body is a different byte sequence: a strong ETag
+        # of the original only stays valid as a weak one (RFC 9110 8.8.3)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _choose_encoding(request, response):
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        varies_on_cookie = 'cookie' in response.get('Vary', '').lower()
+        if brotli is not None and 'br' in accepted and not varies_on_cookie:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+
+def weak_etag(content):
+    """Weak ETag from a fast 64-bit hash of the body"""
+    return f'W/"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+
+
+class ConditionalGetMiddleware(DjangoConditionalGetMiddleware):
+    """
+    Django's ConditionalGetMiddleware with weak ETags: hashed with BLAKE2b
+    instead of MD5, and only for GET responses that may be stored.
+    """
+
+    def process_response(self, request, response):
+        if (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+            and not response.has_header('ETag')
+            and self.needs_etag(response)
+            and response.content
+        ):
+            response.headers['ETag'] = weak_etag(response.content)
+        return super().process_response(request, response)
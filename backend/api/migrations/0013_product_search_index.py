@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from api.search import get_search_backend
+
+    using = schema_editor.connection.alias
+    backend = get_search_backend(using)
+    backend.install(using)
+    backend.rebuild(apps.get_model('api', 'Product'), using)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from api.search import get_search_backend
+
+    using = schema_editor.connection.alias
+    get_search_backend(using).uninstall(using)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def rebuild_related_products(apps, schema_editor):
+    # 0010 built the index from the default database whichever one was being
+    # migrated; rebuild it from this database's own products
+    from api.related import rebuild_related
+
+    rebuild_related(
+        product_model=apps.get_model('api', 'Product'),
+        related_model=apps.get_model('api', 'RelatedProduct'),
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_catalogversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_related_products, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,10 @@
-from django.db import models
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 
@@ -63,6 +69,9 @@ class Product(models.Model):
         null=True,
         help_text="QR code image to display on payment page"
     )
+    # Resized copies of the images above (see api/images.py)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
+    payment_qr_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # Relationships
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='products')
@@ -84,6 +93,20 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the product list
+            models.Index(fields=['-created_at', '-id'], name='api_product_created_id'),
+            # /products/featured/ (partial: only the few featured rows are indexed)
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True, is_featured=True),
+                name='api_product_featured_created',
+            ),
+            # /products/by_price/ and ?price= filters
+            models.Index(fields=['is_active', 'price'], name='api_product_active_price'),
+            # /products/by_category/ and ?category= filters
+            models.Index(fields=['category', 'is_active', '-created_at', '-id'], name='api_product_category_created'),
+        ]
 
     def __str__(self):
         return self.name
@@ -114,6 +137,25 @@ class Product(models.Model):
         return self.image_url or ''
 
 
+class RelatedProduct(models.Model):
+    """Precomputed related product, scored by shared category and tags (see api/related.py)"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='related_from')
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['product', '-score']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'related'], name='unique_related_product'),
+        ]
+        indexes = [
+            models.Index(fields=['product', '-score'], name='api_related_product_score'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} ({self.score})"
+
+
 class Order(models.Model):
     """Order/Checkout Model"""
     ORDER_STATUS_CHOICES = [
@@ -151,6 +193,7 @@ class Order(models.Model):
         null=True,
         help_text="Proof of payment uploaded by customer"
     )
+    payment_screenshot_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # Download
     download_link = models.URLField(blank=True, help_text="Link sent to customer after payment")
@@ -162,6 +205,13 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the order list
+            models.Index(fields=['-created_at', '-id'], name='api_order_created_id'),
+            # /orders/by_email/ and ?status= filters
+            models.Index(fields=['email', '-created_at', '-id'], name='api_order_email_created'),
+            models.Index(fields=['status', '-created_at', '-id'], name='api_order_status_created'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.product.name} - {self.email}"
@@ -174,6 +224,47 @@ class Order(models.Model):
         super().save(*args, **kwargs)
 
 
+class OutboundEmail(models.Model):
+    """Outbound email queue (outbox) entry, drained by `process_email_queue`"""
+    KIND_CHOICES = [
+        ('order_confirmation', 'Order Confirmation'),
+        ('download_link', 'Download Link'),
+        ('payment_verified', 'Payment Verified'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='outbound_emails')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+
+    # Delivery state
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time a worker may pick this up (retry backoff / claim lease)"
+    )
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for order #{self.order_id} ({self.status})"
+
+
 class SiteSettings(models.Model):
     """Site-wide Settings Model"""
     site_name = models.CharField(max_length=200, default="SKILCART")
@@ -184,6 +275,7 @@ class SiteSettings(models.Model):
         null=True,
         help_text="Default QR shown on payment page when product QR is not set"
     )
+    payment_qr_default_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     privacy_policy = models.TextField(blank=True, default='', help_text="Privacy Policy content")
     terms_and_conditions = models.TextField(blank=True, default='', help_text="Terms & Conditions content")
     refund_policy = models.TextField(blank=True, default='', help_text="Refund Policy content")
@@ -215,4 +307,81 @@ class SiteSettings(models.Model):
         self.pk = 1
         super().save(*args, **kwargs)
 
+    # Process-wide cache for load(). The shared cache holds a version token
+    # that is replaced on every save, so other workers notice edits within
+    # SITE_SETTINGS_CACHE_TTL seconds.
+    CACHE_VERSION_KEY = 'api:site_settings:version'
+    _cached = None
+    _cached_version = None
+    _checked_at = 0.0
+
+    @classmethod
+    def load(cls):
+        """
+        Return the site settings singleton.
+
+        Served from memory; the shared cache version is only checked once
+        per SITE_SETTINGS_CACHE_TTL seconds and the database is only queried
+        when the version has changed. Treat the result as read-only.
+        """
+        now = time.monotonic()
+        obj = cls._cached
+        if obj is not None and now - cls._checked_at < settings.SITE_SETTINGS_CACHE_TTL:
+            return obj
+
+        version = cache.get(cls.CACHE_VERSION_KEY)
+        if version is None:
+            cache.add(cls.CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(cls.CACHE_VERSION_KEY)
+
+        if obj is None or version != cls._cached_version:
+            # Read first: get_or_create() counts as a write (and would pin
+            # the client to the primary database, see api/replicas.py)
+            obj = cls.objects.filter(pk=1).first()
+            if obj is None:
+                try:
+                    with transaction.atomic():
+                        obj = cls.objects.create(pk=1)
+                except IntegrityError:
+                    # Created by another worker meanwhile
+                    obj = cls.objects.get(pk=1)
+                # The insert already replaced the version via post_save
+                version = cache.get(cls.CACHE_VERSION_KEY)
+            cls._cached = obj
+            cls._cached_version = version
+        cls._checked_at = now
+        return obj
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Drop this process's copy and tell other workers to reload"""
+        cls._cached = None
+        cache.set(cls.CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+
 
+
+
+class MediaBlob(models.Model):
+    """
+    A file in content-addressed media storage (api/storage.py), stored once
+    however many rows reference it
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0, help_text="References handed out by saves, minus deletes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_saved_at = models.DateTimeField(default=timezone.now, help_text="Unreferenced blobs are kept for a grace period after this")
+
+    def __str__(self):
+        return self.name
+
+
+class CatalogVersion(models.Model):
+    """
+    Counter bumped with every catalog change, in the same transaction, so
+    a read replica can tell whether it has caught up (api/replicas.py)
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
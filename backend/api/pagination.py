@@ -0,0 +1,123 @@
+"""
+Pagination classes and streaming JSON responses for the API
+"""
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+from .renderers import FastJSONRenderer
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (-created_at, -id).
+
+    Each page is a `WHERE created_at < cursor ... LIMIT n` query, so memory
+    and latency stay flat however deep the client pages, and rows inserted
+    while paging don't shift or duplicate results.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        # Fixed keyset; ?ordering= from OrderingFilter doesn't apply here
+        return self.ordering
+
+
+class ListCursorPagination(CursorPagination):
+    """
+    Keyset pagination for list endpoints. Follows the view's OrderingFilter
+    (default `-created_at, -id`), so `?ordering=` keeps working.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetOrPageNumberPagination(BasePagination):
+    """
+    Page-number pagination (with `count`) by default; `?pagination=cursor`
+    (or a `cursor` from a previous page) switches to keyset pagination,
+    which skips the COUNT(*) and OFFSET scans so deep pages stay fast.
+
+    Results ranked by relevance (`?q=` without `?ordering=`) are always
+    paged by number: a cursor can't be placed on a computed rank, and
+    keyset pagination would re-order them by the view's ordering.
+    """
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.page_number = PageNumberPagination()
+        self.cursor = ListCursorPagination()
+        self.active = self.page_number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        use_cursor = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor.cursor_query_param in request.query_params
+        ) and not self._ranked(queryset)
+        self.active = self.cursor if use_cursor else self.page_number
+        return self.active.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    @staticmethod
+    def _ranked(queryset):
+        order_by = queryset.query.order_by
+        return bool(order_by) and order_by[0] == '-search_rank'
+
+    @property
+    def display_page_controls(self):
+        return self.active.display_page_controls
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_number.get_schema_operation_parameters(view) + [{
+            'name': self.mode_query_param,
+            'required': False,
+            'in': 'query',
+            'description': "Set to 'cursor' for keyset pagination without a total count "
+                           "(ignored for results ranked by relevance).",
+            'schema': {'type': 'string'},
+        }]
+
+
+def stream_json_list(queryset, serializer_class, context, ordering=('-created_at', '-id'), chunk_size=500):
+    """
+    Stream a queryset as a JSON array, serializing `chunk_size` rows at a
+    time. prefetch_related lookups are applied per chunk, so memory stays
+    bounded for exports of any size.
+    """
+    renderer = FastJSONRenderer()
+
+    def chunks():
+        chunk = []
+        for obj in queryset.order_by(*ordering).iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def content():
+        yield b'['
+        first = True
+        for chunk in chunks():
+            data = renderer.render(serializer_class(chunk, many=True, context=context).data)
+            # Strip the enclosing brackets and join chunks with commas
+            body = data[1:-1]
+            if body:
+                if not first:
+                    yield b','
+                yield body
+                first = False
+        yield b']'
+
+    return StreamingHttpResponse(content(), content_type='application/json')
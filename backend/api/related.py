@@ -0,0 +1,176 @@
+"""
+Related products index.
+
+Related products are precomputed into the RelatedProduct table so product
+pages read them with a single indexed query. A product's score against
+another active product is RELATED_CATEGORY_WEIGHT for a shared category
+plus one per shared tag; ties go to the newer product. Only the top
+RELATED_PRODUCTS_STORED entries per product are kept.
+
+The index is refreshed incrementally from signals (see signals.py) and can
+be rebuilt with `python manage.py rebuild_related_products`.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Product, RelatedProduct
+
+RELATED_CATEGORY_WEIGHT = 2
+RELATED_PRODUCTS_STORED = 10
+RELATED_PRODUCTS_SHOWN = 5
+
+
+def _chunks(ids, size=500):
+    # Stays under the database's query parameter limit
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _categories_and_tags(product_model, using, product_ids):
+    """Categories and tags of these products, if active"""
+    category_ids = set()
+    tag_ids = set()
+    for chunk in _chunks(product_ids):
+        category_ids.update(product_model.objects.using(using).filter(
+            pk__in=chunk, is_active=True, category__isnull=False,
+        ).values_list('category_id', flat=True))
+        tag_ids.update(product_model.tags.through.objects.using(using).filter(
+            product_id__in=chunk, product__is_active=True,
+        ).values_list('tag_id', flat=True))
+    return category_ids, tag_ids
+
+
+class _Catalog:
+    """
+    Active products with their category and tags, loaded in two queries.
+
+    With `around`, only the products sharing a category or tag with those
+    products are loaded: enough to score them, not the others.
+    """
+
+    def __init__(self, product_model, using=None, around=None):
+        products = product_model.objects.using(using).filter(is_active=True)
+        memberships = product_model.tags.through.objects.using(using).filter(product__is_active=True)
+        if around is not None:
+            category_ids, tag_ids = _categories_and_tags(product_model, using, around)
+            memberships = memberships.filter(tag_id__in=tag_ids)
+            products = products.filter(Q(category_id__in=category_ids) | Q(pk__in=memberships.values('product_id')))
+
+        self.category = {}
+        self.created = {}
+        for pk, category_id, created_at in products.values_list('id', 'category_id', 'created_at'):
+            self.category[pk] = category_id
+            self.created[pk] = created_at
+
+        self.by_category = defaultdict(set)
+        for pk, category_id in self.category.items():
+            if category_id:
+                self.by_category[category_id].add(pk)
+
+        self.tags = defaultdict(set)
+        self.by_tag = defaultdict(set)
+        for pk, tag_id in memberships.values_list('product_id', 'tag_id'):
+            self.tags[pk].add(tag_id)
+            self.by_tag[tag_id].add(pk)
+
+    def scores(self, pk):
+        scores = Counter()
+        category_id = self.category[pk]
+        if category_id:
+            for other in self.by_category[category_id]:
+                scores[other] += RELATED_CATEGORY_WEIGHT
+        for tag_id in self.tags[pk]:
+            for other in self.by_tag[tag_id]:
+                scores[other] += 1
+        scores.pop(pk, None)
+        return scores
+
+    def neighbours(self, pk):
+        if pk not in self.category:
+            return set()
+        return set(self.scores(pk))
+
+    def top_related(self, pk):
+        if pk not in self.category:
+            return []
+        ranked = sorted(
+            self.scores(pk).items(),
+            key=lambda item: (item[1], self.created[item[0]]),
+            reverse=True,
+        )
+        return ranked[:RELATED_PRODUCTS_STORED]
+
+
+def _rebuild(catalog, product_ids, related_model, using=None):
+    existing_rows = related_model.objects.using(using)
+    if product_ids is None:
+        product_ids = set(catalog.category) | set(existing_rows.values_list('product_id', flat=True))
+    else:
+        existing_rows = existing_rows.filter(product_id__in=product_ids)
+
+    existing = defaultdict(list)
+    for pk, related_id, score in existing_rows.order_by(
+        'product', '-score', '-related__created_at'
+    ).values_list('product_id', 'related_id', 'score'):
+        existing[pk].append((related_id, score))
+
+    changed = []
+    rows = []
+    for pk in product_ids:
+        top = catalog.top_related(pk)
+        if top != existing.get(pk, []):
+            changed.append(pk)
+            rows.extend(related_model(product_id=pk, related_id=other, score=score) for other, score in top)
+
+    with transaction.atomic(using=using):
+        # Chunked to stay under the database's query parameter limit
+        for start in range(0, len(changed), 500):
+            existing_rows.filter(product_id__in=changed[start:start + 500]).delete()
+        related_model.objects.using(using).bulk_create(rows, batch_size=500)
+    return set(changed)
+
+
+def rebuild_related(product_ids=None, product_model=Product, related_model=RelatedProduct, using=None):
+    """
+    Recompute the stored related products for `product_ids` (all products
+    when None). Only products whose list actually changed are rewritten.
+    The model and `using` arguments let data migrations pass historical
+    models and the database being migrated.
+
+    Returns:
+        Set of product ids whose related list changed
+    """
+    return _rebuild(_Catalog(product_model, using), product_ids, related_model, using)
+
+
+def refresh_related(product_ids, using=None):
+    """
+    Update the index after products' category, tags or status changed.
+
+    Affected lists are the products' own, the products that currently list
+    them, and the products they now share a category or tag with. Only the
+    products needed to score those are loaded, not the whole catalog.
+
+    Returns:
+        Set of product ids whose related list changed
+    """
+    product_ids = set(product_ids)
+    neighbourhood = _Catalog(Product, using, around=product_ids)
+    affected = set(product_ids)
+    for pk in product_ids:
+        affected |= neighbourhood.neighbours(pk)
+    affected |= set(
+        RelatedProduct.objects.using(using).filter(related_id__in=product_ids).values_list('product_id', flat=True)
+    )
+    return _rebuild(_Catalog(Product, using, around=affected), affected, RelatedProduct, using)
+
+
+def related_products(product, limit=RELATED_PRODUCTS_SHOWN):
+    """Related products for a product page, read from the index in one query"""
+    return Product.objects.using(product._state.db).filter(
+        related_from__product=product,
+        is_active=True,
+    ).order_by('-related_from__score', '-created_at')[:limit]
@@ -0,0 +1,175 @@
+"""
+Read replicas for the catalog.
+
+CatalogReplicaRouter sends reads of catalog models (products, categories,
+tags and the related products index) to one of DATABASE_REPLICAS, and
+everything else to the primary ('default'). Only GET/HEAD requests read
+from a replica; management commands, background workers and requests that
+write use the primary throughout, as do reads inside a transaction.
+
+After a request writes, ReplicaPinningMiddleware pins the client to the
+primary for REPLICA_PIN_SECONDS with a cookie, so the pages it loads next
+(e.g. the success page after posting an order) see its own writes.
+
+Catalog writes bump a counter (CatalogVersion) in the same transaction.
+A replica whose counter is behind the primary's hasn't received the latest
+change and isn't used until it has; neither is one that can't be reached.
+The check runs at most once per REPLICA_CHECK_INTERVAL seconds per process,
+and again as soon as the catalog cache generations change, so a page cached
+under a new generation is never built from a replica that lacks the change.
+"""
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import F
+
+from .caching import get_generations
+
+CATALOG_MODELS = {'api.category', 'api.tag', 'api.product', 'api.product_tags', 'api.relatedproduct'}
+
+PIN_COOKIE = 'primary_pin'
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class _RequestState:
+    def __init__(self, replicas_allowed):
+        self.replicas_allowed = replicas_allowed
+        self.wrote = False
+        self.replica = None
+
+
+# Set by ReplicaPinningMiddleware for the duration of a request
+_request_state = ContextVar('replica_request_state', default=None)
+
+_health_lock = threading.Lock()
+_health = {'generations': None, 'checked_at': 0.0, 'replicas': []}
+
+
+def catalog_version(using):
+    """The catalog change counter of a database (0 before the first change)"""
+    from .models import CatalogVersion
+
+    return CatalogVersion.objects.using(using).filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def bump_catalog_version(using=DEFAULT_DB_ALIAS):
+    """Count a catalog change; call inside the transaction that makes it"""
+    from .models import CatalogVersion
+
+    if not CatalogVersion.objects.using(using).filter(pk=1).update(version=F('version') + 1):
+        CatalogVersion.objects.using(using).create(pk=1, version=1)
+
+
+def replica_versions():
+    """{alias: catalog version, or None if it can't be read} for each replica"""
+    versions = {}
+    for alias in settings.DATABASE_REPLICAS:
+        try:
+            versions[alias] = catalog_version(alias)
+        except DatabaseError:
+            versions[alias] = None
+    return versions
+
+
+def healthy_replicas():
+    """Replicas that are reachable and have every catalog change of the primary"""
+    if not settings.DATABASE_REPLICAS:
+        return []
+    generations = get_generations(['catalog'])
+    now = time.monotonic()
+    with _health_lock:
+        if _health['generations'] == generations and now - _health['checked_at'] < settings.REPLICA_CHECK_INTERVAL:
+            return _health['replicas']
+
+    primary = catalog_version(DEFAULT_DB_ALIAS)
+    replicas = [alias for alias, version in replica_versions().items() if version is not None and version >= primary]
+    with _health_lock:
+        _health.update(generations=generations, checked_at=now, replicas=replicas)
+    return replicas
+
+
+def _replica_for_request(state):
+    if state.replica is None:
+        replicas = healthy_replicas()
+        # Sticks for the rest of the request, so its reads are consistent
+        state.replica = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+    return state.replica
+
+
+def _instance_db(hints):
+    """The database of the instance a query is made for, if any"""
+    instance = hints.get('instance')
+    return instance._state.db if instance is not None else None
+
+
+class CatalogReplicaRouter:
+    def db_for_read(self, model, **hints):
+        db = _instance_db(hints)
+        if db is not None and db != DEFAULT_DB_ALIAS and db not in settings.DATABASE_REPLICAS:
+            # Another database altogether (e.g. a benchmark's scratch file)
+            return db
+        state = _request_state.get()
+        if (
+            state is None
+            or not state.replicas_allowed
+            or state.wrote
+            or model._meta.label_lower not in CATALOG_MODELS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return _replica_for_request(state)
+
+    def db_for_write(self, model, **hints):
+        db = _instance_db(hints)
+        if db in settings.DATABASE_REPLICAS or (db is None and model._meta.label_lower in CATALOG_MODELS):
+            # Catalog rows may have been read from a replica; they're written to the primary
+            db = DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if state is not None and db in (None, DEFAULT_DB_ALIAS):
+            state.wrote = True
+        return db
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        pool = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db == obj2._state.db or (obj1._state.db in pool and obj2._state.db in pool):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Lets GET/HEAD requests read the catalog from replicas, unless the client
+    wrote within REPLICA_PIN_SECONDS; pins clients to the primary after a
+    request writes. Goes before SessionMiddleware, so session saves count.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RequestState(
+            replicas_allowed=request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES,
+        )
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
@@ -0,0 +1,202 @@
+"""
+Product full-text search.
+
+`?q=` on /api/products/ is answered from a full-text index instead of
+`LIKE '%term%'` scans. Each database vendor gets a backend:
+
+- SQLite: an FTS5 table (api_product_fts) keyed by product id, kept in sync
+  from Product signals (see signals.py)
+- MySQL: a FULLTEXT index on api_product, maintained by MySQL itself
+- anything else: icontains over the same fields, without ranking
+
+Every term must match; the last one also matches as a prefix, so results
+update while the customer types. Results are ranked by relevance; on
+SQLite a match in the name weighs more than one in the description.
+
+The index can be rebuilt with `python manage.py rebuild_search_index`.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_FIELDS = ('name', 'short_description', 'description')
+# Relevance weight of a match in each field, in SEARCH_FIELDS order
+SEARCH_WEIGHTS = (10.0, 4.0, 1.0)
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split user input into plain word terms (drops the backends' query syntax)"""
+    return _TERM_RE.findall(query or '')[:10]
+
+
+class SearchBackend:
+    """
+    Base search backend: icontains on every field for every term.
+
+    Backends are stateless; `using` is the database alias of the products.
+    Ranked backends annotate results with `search_rank` (higher is better).
+    """
+    ranked = False
+
+    def install(self, using):
+        """Create the index structures (called from a migration)"""
+
+    def uninstall(self, using):
+        """Drop the index structures"""
+
+    def rebuild(self, product_model, using):
+        """Reindex every product; returns the number indexed"""
+        return 0
+
+    def update(self, products, using):
+        """Reindex these products after they were saved"""
+
+    def remove(self, product_ids, using):
+        """Drop these products from the index"""
+
+    def search(self, queryset, terms):
+        """Filter `queryset` to products matching every term"""
+        for term in terms:
+            match = Q()
+            for field in SEARCH_FIELDS:
+                match |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(match)
+        return queryset
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    ranked = True
+    table = 'api_product_fts'
+
+    def install(self, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"{', '.join(SEARCH_FIELDS)}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def uninstall(self, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def rebuild(self, product_model, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {', '.join(SEARCH_FIELDS)}) "
+                f"SELECT id, {', '.join(SEARCH_FIELDS)} FROM {product_model._meta.db_table}"
+            )
+            return cursor.rowcount
+
+    def update(self, products, using):
+        products = list(products)
+        self.remove([product.pk for product in products], using)
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, {', '.join(SEARCH_FIELDS)}) "
+                f"VALUES (%s{', %s' * len(SEARCH_FIELDS)})",
+                [[product.pk] + [getattr(product, field) for field in SEARCH_FIELDS] for product in products],
+            )
+
+    def remove(self, product_ids, using):
+        with connections[using].cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [[pk] for pk in product_ids])
+
+    def search(self, queryset, terms):
+        # Quoted terms can't be read as FTS5 operators; '*' makes a prefix query
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+        db_table = queryset.model._meta.db_table
+        # A join, not `id IN (...)` plus a per-row rank subquery: FTS5 would
+        # evaluate the MATCH again for every row. extra() because the ORM
+        # can't join a virtual table.
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.table}.rowid = {db_table}.id', f'{self.table} MATCH %s'],
+            params=[match],
+            # bm25() is lower for better matches; negate it so higher ranks first
+            select={'search_rank': f'-bm25({self.table}, {weights})'},
+        )
+
+
+class MySQLFullTextBackend(SearchBackend):
+    ranked = True
+    index = 'api_product_fulltext'
+
+    def install(self, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"CREATE FULLTEXT INDEX {self.index} ON api_product ({', '.join(SEARCH_FIELDS)})")
+
+    def uninstall(self, using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DROP INDEX {self.index} ON api_product')
+
+    def search(self, queryset, terms):
+        # Boolean mode: '+' requires every term, '*' on the last one matches a
+        # prefix. MySQL's relevance doesn't take per-column weights.
+        match = ' '.join(f'+{term}' for term in terms) + '*'
+        return queryset.annotate(
+            search_rank=RawSQL(f"MATCH ({', '.join(SEARCH_FIELDS)}) AGAINST (%s IN BOOLEAN MODE)", [match]),
+        ).filter(search_rank__gt=0)
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'mysql': MySQLFullTextBackend,
+}
+
+
+def get_search_backend(using='default'):
+    """Return the search backend for a database alias's vendor"""
+    return BACKENDS.get(connections[using].vendor, SearchBackend)()
+
+
+def search_products(queryset, query):
+    """
+    Filter a Product queryset to products matching `query`. Results of
+    ranked backends are ordered by relevance.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    backend = get_search_backend(queryset.db)
+    queryset = backend.search(queryset, terms)
+    if backend.ranked:
+        queryset = queryset.order_by('-search_rank', '-created_at', '-id')
+    return queryset
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    """
+    `?q=` full-text product search. Results are ordered by relevance unless
+    the client asks for an explicit `?ordering=`. Ranked results are paged
+    by number, not cursor (see pagination.KeysetOrPageNumberPagination).
+
+    Must come after OrderingFilter in filter_backends so the relevance
+    ordering isn't overridden by the view's default ordering.
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not search_terms(query):
+            return queryset
+        ordering = queryset.query.order_by
+        queryset = search_products(queryset, query)
+        if 'ordering' in request.query_params:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Full-text search over name and descriptions, ranked by relevance.',
+            'schema': {'type': 'string'},
+        }]
@@ -1,5 +1,43 @@
 from rest_framework import serializers
+from .images import FORMATS, derivative_urls, srcset
 from .models import Product, Category, Tag, Order, SiteSettings
+from .related import related_products
+from .uploads import PaymentScreenshotField
+
+
+def image_srcsets(obj, field_name, request=None):
+    """
+    `srcset` value per format ('webp', 'jpeg') of an image field's resized
+    copies; {} until they are built
+    """
+    def url(storage, name):
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    srcsets = {}
+    for fmt in FORMATS:
+        urls = derivative_urls(obj, field_name, fmt, url)
+        if urls:
+            srcsets[fmt] = srcset(urls)
+    return srcsets
+
+
+class EagerLoadingMixin:
+    """
+    Declares the relations a serializer renders so viewsets can load them
+    up front (see views.EagerLoadingViewSetMixin) instead of one query per
+    row.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -14,18 +52,22 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description']
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer for product list view (minimal data)"""
+    select_related_fields = ('category',)
+    prefetch_related_fields = ('tags',)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     display_image = serializers.SerializerMethodField()
+    display_image_srcset = serializers.SerializerMethodField()
     payment_qr = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'short_description', 'price', 'original_price',
-            'discount_percentage', 'display_image', 'payment_qr', 'badge_text', 'category', 'tags',
+            'discount_percentage', 'display_image', 'display_image_srcset', 'payment_qr', 'badge_text',
+            'category', 'tags',
             'is_featured', 'created_at'
         ]
 
@@ -37,6 +79,9 @@ class ProductListSerializer(serializers.ModelSerializer):
             return obj.image.url
         return obj.image_url or ''
 
+    def get_display_image_srcset(self, obj):
+        return image_srcsets(obj, 'image', self.context.get('request'))
+
     def get_payment_qr(self, obj):
         request = self.context.get('request')
         if obj.payment_qr and hasattr(obj.payment_qr, 'url'):
@@ -46,11 +91,14 @@ class ProductListSerializer(serializers.ModelSerializer):
         return ''
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer for product detail view (full data)"""
+    select_related_fields = ('category',)
+    prefetch_related_fields = ('tags',)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     display_image = serializers.SerializerMethodField()
+    display_image_srcset = serializers.SerializerMethodField()
     payment_qr = serializers.SerializerMethodField()
     related_products = serializers.SerializerMethodField()
 
@@ -59,7 +107,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'slug', 'description', 'short_description',
             'price', 'original_price', 'discount_percentage', 'display_image',
-            'payment_qr', 'badge_text', 'features', 'what_included', 'perfect_for',
+            'display_image_srcset', 'payment_qr', 'badge_text', 'features', 'what_included', 'perfect_for',
             'category', 'tags', 'is_featured', 'created_at', 'updated_at',
             'related_products'
         ]
@@ -72,6 +120,9 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             return obj.image.url
         return obj.image_url or ''
 
+    def get_display_image_srcset(self, obj):
+        return image_srcsets(obj, 'image', self.context.get('request'))
+
     def get_payment_qr(self, obj):
         request = self.context.get('request')
         if obj.payment_qr and hasattr(obj.payment_qr, 'url'):
@@ -81,30 +132,18 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         return ''
 
     def get_related_products(self, obj):
-        """Get related products (same category or tags)"""
-        related = Product.objects.filter(is_active=True).exclude(id=obj.id)
-        
-        # Filter by category first
-        if obj.category:
-            related = related.filter(category=obj.category)
-        
-        # If not enough, add by tags
-        if related.count() < 5 and obj.tags.exists():
-            tag_related = Product.objects.filter(
-                is_active=True,
-                tags__in=obj.tags.all()
-            ).exclude(id=obj.id).distinct()
-            related = (related | tag_related).distinct()
-        
-        serializer = ProductListSerializer(related[:5], many=True, context=self.context)
+        """Get related products (same category or tags) from the precomputed index"""
+        related = ProductListSerializer.setup_eager_loading(related_products(obj))
+        serializer = ProductListSerializer(related, many=True, context=self.context)
         return serializer.data
 
 
-class OrderCreateSerializer(serializers.ModelSerializer):
+class OrderCreateSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer for creating orders"""
+    select_related_fields = ('product',)
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_slug = serializers.CharField(source='product.slug', read_only=True)
-    MAX_SCREENSHOT_SIZE = 20 * 1024 * 1024  # 20 MB
+    payment_screenshot = PaymentScreenshotField(required=False, allow_null=True)
 
     class Meta:
         model = Order
@@ -116,11 +155,6 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['unit_price', 'total_amount', 'status', 'payment_id']
 
-    def validate_payment_screenshot(self, value):
-        if value and hasattr(value, 'size') and value.size > self.MAX_SCREENSHOT_SIZE:
-            raise serializers.ValidationError("Screenshot must be 20 MB or smaller.")
-        return value
-
     def create(self, validated_data):
         product = validated_data['product']
         validated_data['unit_price'] = product.price
@@ -136,8 +170,10 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class OrderDetailSerializer(serializers.ModelSerializer):
+class OrderDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer for order details"""
+    select_related_fields = ('product__category',)
+    prefetch_related_fields = ('product__tags',)
     product = ProductListSerializer(read_only=True)
     payment_screenshot = serializers.SerializerMethodField()
 
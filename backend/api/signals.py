@@ -0,0 +1,192 @@
+"""
+Signal handlers for the API app (connected in ApiConfig.ready)
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import bump_generations
+from .images import FORMATS, IMAGE_FIELDS, is_stale, manifest_field, schedule_derivatives
+from .models import Category, Order, Product, RelatedProduct, SiteSettings, Tag
+from .related import refresh_related
+from .replicas import bump_catalog_version
+from .search import get_search_backend
+from .storage import release
+
+
+def _bump_on_commit(names):
+    names = set(names)
+    transaction.on_commit(lambda: bump_generations(*names))
+
+
+def _product_pages(queryset):
+    """Generation names of the product/checkout pages for these products"""
+    return [f'product:{slug}' for slug in queryset.values_list('slug', flat=True).distinct()]
+
+
+def _refresh_related_on_commit(product_ids, extra_names=(), using='default'):
+    """
+    After commit, update the related products index for these products and
+    drop the cached pages that show them: their own pages, pages whose
+    related list changed, and pages that list them as related.
+    """
+    product_ids = set(product_ids)
+    extra_names = set(extra_names)
+    # Replicas without this change aren't read from until they have it
+    bump_catalog_version(using)
+
+    def refresh():
+        changed = refresh_related(product_ids, using)
+        listers = set(
+            RelatedProduct.objects.using(using).filter(related_id__in=product_ids).values_list('product_id', flat=True)
+        )
+        pages = _product_pages(Product.objects.using(using).filter(pk__in=product_ids | changed | listers))
+        # Again for the related products index, written in its own transaction
+        bump_catalog_version(using)
+        bump_generations('catalog', *pages, *extra_names)
+
+    transaction.on_commit(refresh, using=using)
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def site_settings_changed(sender, instance, **kwargs):
+    # After commit, so other workers can't reload the old row under the new version
+    transaction.on_commit(SiteSettings.invalidate_cache)
+    _bump_on_commit(['site'])
+
+
+# Related products index and storefront page cache invalidation
+
+@receiver(post_init, sender=Product)
+def remember_product_slug(sender, instance, **kwargs):
+    # Old slug, so pages cached under the previous slug are dropped too.
+    # Read from __dict__ so deferred fields don't trigger a query per instance.
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, using, **kwargs):
+    _refresh_related_on_commit([instance.pk], [f'product:{instance._loaded_slug}'], using)
+    instance._loaded_slug = instance.slug
+
+
+@receiver(pre_delete, sender=Product)
+def product_deleted(sender, instance, using, **kwargs):
+    # Rows listing this product are cascade-deleted, so collect the listers now
+    listers = RelatedProduct.objects.using(using).filter(related_id=instance.pk).values_list('product_id', flat=True)
+    _refresh_related_on_commit(listers, [f'product:{instance.slug}'], using)
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def product_tags_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        product_ids = [instance.pk]
+    elif pk_set:
+        # tag.products.add(...): instance is the Tag
+        product_ids = pk_set
+    else:
+        product_ids = instance.products.values_list('id', flat=True)
+    _refresh_related_on_commit(product_ids, using=using)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, using, **kwargs):
+    bump_catalog_version(using)
+    # Product pages show the category name
+    _bump_on_commit(['catalog'] + _product_pages(instance.products.all()))
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleted(sender, instance, using, **kwargs):
+    _refresh_related_on_commit(instance.products.values_list('id', flat=True), using=using)
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, using, **kwargs):
+    bump_catalog_version(using)
+    # Product pages show tag names
+    _bump_on_commit(['catalog'] + _product_pages(instance.products.all()))
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleted(sender, instance, using, **kwargs):
+    _refresh_related_on_commit(instance.products.values_list('id', flat=True), using=using)
+
+
+# Product search index (same transaction as the product row)
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, using, raw=False, **kwargs):
+    if not raw:
+        get_search_backend(using).update([instance], using)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, using, **kwargs):
+    get_search_backend(using).remove([instance.pk], using)
+
+
+# Responsive image derivatives (built in the background after commit)
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=SiteSettings)
+def schedule_image_derivatives(sender, instance, using, raw=False, **kwargs):
+    if raw:
+        return
+    stale = [field_name for field_name in IMAGE_FIELDS[sender] if is_stale(instance, field_name)]
+    if stale:
+        transaction.on_commit(lambda: schedule_derivatives(instance, stale, using), using=using)
+
+
+# Media blob references (content-addressed storage, see storage.py)
+
+def _media_names(model, instance):
+    # Raw names from __dict__, so deferred fields don't trigger a query
+    names = {}
+    for field_name in IMAGE_FIELDS[model]:
+        value = instance.__dict__.get(field_name)
+        names[field_name] = getattr(value, 'name', value) or ''
+    return names
+
+
+def _release_on_commit(model, names, using):
+    names = [(field_name, name) for field_name, name in names if name]
+    if names:
+        transaction.on_commit(
+            lambda: [release(model._meta.get_field(field_name).storage, name) for field_name, name in names],
+            using=using,
+        )
+
+
+@receiver(post_init, sender=Product)
+@receiver(post_init, sender=Order)
+@receiver(post_init, sender=SiteSettings)
+def remember_media_names(sender, instance, **kwargs):
+    instance._loaded_media = _media_names(sender, instance)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=SiteSettings)
+def release_replaced_media(sender, instance, using, **kwargs):
+    current = _media_names(sender, instance)
+    _release_on_commit(sender, [
+        (field_name, name) for field_name, name in instance._loaded_media.items()
+        if name != current[field_name]
+    ], using)
+    instance._loaded_media = current
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=SiteSettings)
+def release_deleted_media(sender, instance, using, **kwargs):
+    names = list(_media_names(sender, instance).items())
+    for field_name in IMAGE_FIELDS[sender]:
+        manifest = instance.__dict__.get(manifest_field(field_name)) or {}
+        names += [(field_name, name) for fmt in FORMATS for _, name in manifest.get(fmt, ())]
+    _release_on_commit(sender, names, using)
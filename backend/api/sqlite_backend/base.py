@@ -0,0 +1,69 @@
+"""
+SQLite backend tuned for concurrent requests.
+
+Every connection puts the database in WAL mode, where readers see the last
+committed state without waiting for a writer and a writer doesn't wait for
+readers, and sets the PRAGMAS below.
+
+Transactions (atomic blocks, e.g. creating an order) start with BEGIN
+IMMEDIATE, which takes the write lock up front. Concurrent writers then
+queue on the busy timeout. With SQLite's default BEGIN DEFERRED, a
+transaction that has read and then writes while another one holds the
+lock fails at once with "database is locked", whatever the timeout.
+Django 5.1 offers the same through OPTIONS['transaction_mode'].
+
+OPTIONS in settings.DATABASES:
+
+    'timeout'           seconds a write waits for the lock (busy timeout)
+    'transaction_mode'  'DEFERRED', 'IMMEDIATE' (default) or 'EXCLUSIVE'
+    'pragmas'           {name: value} overriding PRAGMAS
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    # In WAL mode, NORMAL only syncs at checkpoints: a power cut may lose
+    # the last commits but can't corrupt the database
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,  # bytes of the file read through mmap
+    'cache_size': -32000,  # page cache per connection, in KiB when negative
+    'temp_store': 'MEMORY',
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+_PRAGMA_RE = re.compile(r'^[a-z_]+$')
+_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.transaction_mode = options.get('transaction_mode', 'IMMEDIATE').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}")
+        self.pragmas = {**PRAGMAS, **options.get('pragmas', {})}
+        for name, value in self.pragmas.items():
+            # PRAGMA statements can't take parameters
+            if not _PRAGMA_RE.match(name) or not _VALUE_RE.match(str(value)):
+                raise ImproperlyConfigured(f'Invalid SQLite pragma {name} = {value!r}')
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Ours, not sqlite3.connect()'s
+        params.pop('transaction_mode', None)
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,160 @@
+"""
+Static asset pipeline.
+
+`collectstatic` with CompressedManifestStaticFilesStorage copies every
+asset under a content-hashed name (`css/style.3f2a1b4c5d6e.css`, via
+Django's ManifestStaticFilesStorage), minifies the CSS and JS copies, and
+writes precompressed `.gz` and `.br` siblings. `{% static %}` then points
+at the hashed names, which never change content and are served with
+immutable far-future cache headers (see serve_static() and the nginx
+example in the README).
+
+Brotli and JS minification use the `brotli` and `rjsmin` packages when
+installed; without them `.br` files are skipped and JS is only compressed.
+"""
+import gzip
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.views.static import serve
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - optional dependency
+    rjsmin = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml', '.ico')
+
+# Precompressed siblings, preferred first: (Accept-Encoding token, suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# ManifestStaticFilesStorage inserts 12 hex digits before the extension
+_HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(css):
+    """Drop comments and the whitespace CSS doesn't need"""
+    css = _CSS_COMMENT_RE.sub('', css)
+    css = _CSS_SPACE_RE.sub(' ', css)
+    css = _CSS_PUNCTUATION_RE.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    return rjsmin.jsmin(js) if rjsmin is not None else js
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+def compress(data):
+    """{suffix: compressed bytes} for the encodings available"""
+    compressed = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed['.br'] = brotli.compress(data, quality=11)
+    return compressed
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also minifies and precompresses"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            self._optimize(name)
+
+    def _optimize(self, name):
+        extension = posixpath.splitext(name)[1].lower()
+        if extension not in COMPRESSIBLE_EXTENSIONS or not self.exists(name):
+            return
+        with self.open(name) as file:
+            data = file.read()
+
+        minify = MINIFIERS.get(extension)
+        if minify is not None and not name.endswith(f'.min{extension}'):
+            # The hash stays that of the source, which identifies it just as well
+            minified = minify(data.decode('utf-8-sig')).encode('utf-8')
+            if len(minified) < len(data):
+                data = minified
+                self.delete(name)
+                self._save(name, ContentFile(data))
+
+        for suffix, compressed in compress(data).items():
+            if len(compressed) < len(data):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+
+    def stored_name(self, name):
+        # Until collectstatic has written a manifest, fall back to plain names
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        token, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def serve_static(request, path, document_root=None, show_indexes=False):
+    """
+    django.views.static.serve for collected static files, picking the
+    precompressed sibling the client accepts and caching hashed names
+    forever.
+    """
+    document_root = document_root or settings.STATIC_ROOT
+    served = path
+    compressible = posixpath.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+    if compressible:
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted:
+                try:
+                    if os.path.isfile(safe_join(document_root, path + suffix)):
+                        served = path + suffix
+                        break
+                except SuspiciousFileOperation:
+                    break
+
+    # serve() takes the type and encoding from the name ('text/css', 'br')
+    response = serve(request, served, document_root=document_root, show_indexes=show_indexes)
+    if compressible:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    if _HASHED_NAME_RE.search(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
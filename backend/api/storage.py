@@ -0,0 +1,112 @@
+"""
+Content-addressed media storage.
+
+Files are saved under the SHA-256 of their content instead of their upload
+name (`payment_qr/3f/3fa9...e1.png`), so the same QR code uploaded for
+twenty products, or a screenshot re-uploaded on a checkout retry, is stored
+once. A name never changes content, so media can be cached forever (see
+serve_media() and the nginx example in the README).
+
+Each file has a MediaBlob row counting its references: every save() hands
+out a reference, every delete() drops one. delete() never removes the file
+itself; `python manage.py cleanup_media` recounts references from the
+database and removes blobs that stayed unreferenced for a grace period.
+Files saved under other names (before this storage was enabled) are
+deleted as with FileSystemStorage.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.utils import timezone
+from django.views.static import serve
+
+from .models import MediaBlob
+
+_HASHED_NAME_RE = re.compile(r'(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{62}(?:\.\w+)?$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_content_addressed(name):
+    return bool(name and _HASHED_NAME_RE.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage keeping one file per distinct content"""
+
+    def hashed_name(self, name, content):
+        """`<upload dir>/<2 hex>/<sha256><ext>` for the content"""
+        sha256 = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        digest = sha256.hexdigest()
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+
+        # The row first: cleanup_media only removes a file after deleting
+        # its row, and this write keeps it from doing so
+        blob, created = MediaBlob.objects.get_or_create(name=name, defaults={'size': content.size})
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1, last_saved_at=timezone.now())
+
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            # Restart the grace period of a file cleanup_media may be looking at
+            os.utime(full_path)
+        else:
+            self._write(full_path, content)
+        return name
+
+    def _write(self, full_path, content):
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        # Write aside and rename, so concurrent saves of the same content
+        # never expose a partly written file
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    temp.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+            os.chmod(temp_path, self.file_permissions_mode or 0o644)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def delete(self, name):
+        if not is_content_addressed(name):
+            return super().delete(name)
+        MediaBlob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+
+def release(storage, name):
+    """
+    Drop a model's reference to a stored file. Only content-addressed files
+    are released; older uploads are left in place as before.
+    """
+    if isinstance(storage, ContentAddressedStorage) and is_content_addressed(name):
+        storage.delete(name)
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """django.views.static.serve, with far-future caching of hashed names"""
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if is_content_addressed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -0,0 +1,99 @@
+"""
+Template precompilation.
+
+Templates are parsed once per process by the cached loader (see TEMPLATES
+in settings). compile_templates() parses every project template up front
+and checks that the templates they extend or include exist. With
+TEMPLATE_WARMUP on, wsgi.py/asgi.py run it as the worker starts, so the
+first requests don't pay for parsing and a broken template stops the
+deploy instead of failing a page. `python manage.py compile_templates`
+runs the same check from a build step.
+"""
+import os
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.template.utils import get_app_template_dirs
+
+
+def _django_engines():
+    return [backend.engine for backend in engines.all() if isinstance(backend, DjangoTemplates)]
+
+
+def _is_project_dir(directory):
+    return os.path.abspath(directory).startswith(os.path.abspath(settings.BASE_DIR) + os.sep)
+
+
+def template_names(engine, include_apps=False):
+    """
+    {name: whether it's one of ours} for the templates in the engine's DIRS
+    and in the template directories of this project's apps (of every
+    installed app with `include_apps`)
+    """
+    directories = [(directory, True) for directory in engine.dirs]
+    for directory in get_app_template_dirs('templates'):
+        ours = _is_project_dir(directory)
+        if include_apps or ours:
+            directories.append((directory, ours))
+    names = {}
+    for root, ours in directories:
+        for directory, subdirectories, filenames in os.walk(root):
+            subdirectories[:] = [name for name in subdirectories if not name.startswith('.')]
+            for filename in filenames:
+                if not filename.startswith('.'):
+                    name = os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, '/')
+                    # The first directory wins, as with the loaders
+                    names.setdefault(name, ours)
+    return dict(sorted(names.items()))
+
+
+def _referenced_names(template):
+    """Constant names the template extends or includes"""
+    for node in template.nodelist.get_nodes_by_type(ExtendsNode):
+        expression = node.parent_name
+        if isinstance(expression.var, str) and not expression.filters:
+            yield expression.var
+    for node in template.nodelist.get_nodes_by_type(IncludeNode):
+        expression = node.template
+        if isinstance(expression.var, str) and not expression.filters:
+            yield expression.var
+
+
+def compile_templates(include_apps=False):
+    """
+    Parse every template into the engines' cached loaders.
+
+    Returns:
+        (number compiled, [(template name, error message), ...])
+    """
+    compiled = 0
+    errors = []
+    for engine in _django_engines():
+        for name, ours in template_names(engine, include_apps).items():
+            try:
+                template = engine.get_template(name)
+                # Other apps' templates may include ones only their form
+                # renderer finds (django/forms/...)
+                for referenced in _referenced_names(template) if ours else ():
+                    try:
+                        engine.get_template(referenced)
+                    except TemplateDoesNotExist:
+                        raise TemplateDoesNotExist(f'includes missing template {referenced!r}') from None
+            except (TemplateSyntaxError, TemplateDoesNotExist, UnicodeDecodeError) as exc:
+                errors.append((name, str(exc)))
+            else:
+                compiled += 1
+    return compiled, errors
+
+
+def warm_templates():
+    """Compile the project's templates, failing loudly if any is broken"""
+    compiled, errors = compile_templates()
+    if errors:
+        raise ImproperlyConfigured(
+            'Templates failed to compile:\n' + '\n'.join(f'  {name}: {error}' for name, error in errors)
+        )
+    return compiled
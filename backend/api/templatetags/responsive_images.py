@@ -0,0 +1,37 @@
+"""
+Template tags for responsive images (see api/images.py)
+"""
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from ..images import derivative_urls, get_manifest, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(instance, field_name, sizes='100vw', **attrs):
+    """
+    An <img> of an image field with srcsets of its resized WebP and JPEG
+    copies, so browsers download the smallest one that fills `sizes`.
+    Falls back to a plain <img> of the original until the copies are built.
+
+        {% responsive_image product 'image' sizes='300px' alt=product.name loading='lazy' %}
+    """
+    field_file = getattr(instance, field_name)
+    attrs = {'src': field_file.url, **attrs}
+    manifest = get_manifest(instance, field_name)
+    jpeg = derivative_urls(instance, field_name, 'jpeg')
+    if not jpeg:
+        return format_html('<img{}>', flatatt(attrs))
+
+    attrs.update(srcset=srcset(jpeg), sizes=sizes, width=manifest['width'], height=manifest['height'])
+    webp = derivative_urls(instance, field_name, 'webp')
+    if not webp:
+        return format_html('<img{}>', flatatt(attrs))
+    # display: contents keeps the <img> laid out as if it had no wrapper
+    return format_html(
+        '<picture style="display: contents"><source type="image/webp" srcset="{}" sizes="{}"><img{}></picture>',
+        srcset(webp), sizes, flatatt(attrs),
+    )
@@ -0,0 +1,328 @@
+import socket
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib import messages
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import Value
+from django.db.models.functions import Concat
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .caching import fragment_cache_version
+from .fast_serializers import FAST_SERIALIZERS, FastSerializer
+from .models import Category, Order, Product, RelatedProduct, SiteSettings, Tag
+from .utils import send_payment_verified_emails
+
+
+def create_catalog(count, prefix='item'):
+    """`count` active products across two categories and three tags, with an order each"""
+    categories = [
+        Category.objects.create(name=f'{prefix} category {i}', slug=f'{prefix}-category-{i}') for i in range(2)
+    ]
+    tags = [Tag.objects.create(name=f'{prefix} tag {i}', slug=f'{prefix}-tag-{i}') for i in range(3)]
+    products = add_products(categories, tags, count, prefix)
+    return categories, tags, products
+
+
+def add_products(categories, tags, count, prefix='item', start=0):
+    """`count` more products (and an order each) spread over these categories and tags"""
+    products = []
+    for i in range(start, start + count):
+        product = Product.objects.create(
+            name=f'{prefix} product {i}',
+            slug=f'{prefix}-product-{i}',
+            description=f'Description of {prefix} product {i}',
+            short_description='Short & sweet',
+            price=Decimal('99.00') + i,
+            original_price=Decimal('199.50') if i % 2 else None,
+            discount_percentage=50 if i % 2 else 0,
+            image_url='https://cdn.example.com/p.png' if i % 3 else '',
+            category=categories[i % 2],
+            is_featured=i % 2 == 0,
+            features=['Lifetime access', f'Bonus {i}'],
+            badge_text='Bestseller' if i == 0 else '',
+        )
+        product.tags.set(tags[:i % 3 + 1])
+        products.append(product)
+        Order.objects.create(
+            email='buyer@example.com', phone='9999999999', customer_name=f'Buyer {i}',
+            product=product, unit_price=product.price, total_amount=product.price,
+        )
+    return products
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class FastSerializerGoldenTests(TestCase):
+    """The fast JSON path must send exactly the bytes the DRF serializers would"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories, cls.tags, cls.products = create_catalog(5)
+
+    def setUp(self):
+        cache.clear()
+
+    def urls(self):
+        product = self.products[1]
+        order = product.orders.get()
+        return [
+            '/api/products/',
+            '/api/products/?pagination=cursor',
+            f'/api/products/{product.pk}/',
+            '/api/products/featured/',
+            '/api/products/by_price/?min_price=100&max_price=102',
+            f'/api/products/by_category/?category={self.categories[0].slug}',
+            f'/api/categories/{self.categories[1].slug}/products/',
+            f'/api/tags/{self.tags[0].slug}/products/',
+            '/api/orders/',
+            f'/api/orders/{order.pk}/',
+            '/api/orders/by_email/?email=buyer@example.com',
+        ]
+
+    def test_fast_path_matches_drf(self):
+        fast_classes = []
+        data = FastSerializer.data
+
+        def spy(serializer):
+            fast_classes.append(type(serializer))
+            return data.fget(serializer)
+
+        for url in self.urls():
+            with self.subTest(url=url):
+                fast_classes.clear()
+                with mock.patch.object(FastSerializer, 'data', property(spy)):
+                    fast = self.client.get(url)
+                self.assertEqual(fast.status_code, 200)
+                self.assertTrue(fast_classes, f'{url} was not served by a fast serializer')
+
+                cache.clear()
+                with mock.patch.dict(FAST_SERIALIZERS, clear=True):
+                    drf = self.client.get(url)
+                self.assertEqual(fast.content, drf.content)
+
+
+class CachedResponseNegotiationTests(TestCase):
+    """Cached API responses are only served to requests negotiating the same media type"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_catalog(2)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_each_media_type_gets_its_own_entry(self):
+        url = '/api/products/featured/'
+        compact = self.client.get(url, HTTP_ACCEPT='application/json')
+        indented = self.client.get(url, HTTP_ACCEPT='application/json; indent=4')
+        self.assertIn(b'\n    ', indented.content)
+        self.assertNotEqual(indented.content, compact.content)
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='*/*').content, compact.content)
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='application/json; indent=4').content, indented.content)
+        self.assertIn('Accept', compact['Vary'])
+
+    def test_unacceptable_requests_bypass_the_cache(self):
+        url = '/api/products/featured/'
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='application/xml').status_code, 406)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='application/xml').status_code, 406)
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 404)
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class PaymentVerifiedEmailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories, cls.tags, cls.products = create_catalog(3)
+
+    def test_unreachable_server_reports_unsent_orders(self):
+        orders = list(Order.objects.order_by('pk'))
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=closed_port(), EMAIL_USE_TLS=False, EMAIL_TIMEOUT=2,
+        ):
+            self.assertEqual(send_payment_verified_emails(orders), orders)
+
+            admin = site._registry[Order]
+            with mock.patch.object(admin, 'message_user') as message_user:
+                admin.mark_payment_verified(RequestFactory().post('/'), Order.objects.all())
+        self.assertEqual(set(Order.objects.values_list('status', flat=True)), {'verified'})
+        summary, warning = message_user.call_args_list
+        self.assertIn('3 order(s) marked as verified and 0 email(s) sent', summary.args[1])
+        self.assertEqual(warning.args[2], messages.WARNING)
+        for order in orders:
+            self.assertIn(f'#{order.id}', warning.args[1])
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_sent_orders_are_not_reported(self):
+        self.assertEqual(send_payment_verified_emails(Order.objects.select_related('product')), [])
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class QueryCountTests(TestCase):
+    """Every API read runs a fixed number of queries, however many rows it returns"""
+
+    def urls(self, categories, tags, products):
+        product = products[0]
+        order = product.orders.get()
+        return [
+            '/api/products/',
+            '/api/products/?pagination=cursor',
+            f'/api/products/{product.pk}/',
+            '/api/products/featured/',
+            '/api/products/by_price/?min_price=0&max_price=1000',
+            f'/api/products/by_category/?category={categories[0].slug}',
+            '/api/products/facets/',
+            '/api/categories/',
+            f'/api/categories/{categories[0].slug}/',
+            f'/api/categories/{categories[0].slug}/products/',
+            '/api/tags/',
+            f'/api/tags/{tags[0].slug}/',
+            f'/api/tags/{tags[0].slug}/products/',
+            '/api/orders/',
+            f'/api/orders/{order.pk}/',
+            '/api/orders/by_email/?email=buyer@example.com',
+        ]
+
+    def query_counts(self, urls):
+        counts = {}
+        for url in urls:
+            # Warm-up: site settings, the catalog index and cache tokens
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            counts[url] = len(queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        categories, tags, products = create_catalog(3)
+        urls = self.urls(categories, tags, products)
+        few = self.query_counts(urls)
+        add_products(categories, tags, 12, start=3)
+        many = self.query_counts(urls)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(many[url], few[url])
+                # And the count itself stays assertable with 15 rows
+                with self.assertNumQueries(few[url]):
+                    self.client.get(url)
+
+
+class SiteSettingsLoadTests(TestCase):
+    def setUp(self):
+        SiteSettings.invalidate_cache()
+        self.addCleanup(SiteSettings.invalidate_cache)
+
+    def test_hot_path_runs_no_queries(self):
+        SiteSettings.load()
+        with self.assertNumQueries(0):
+            SiteSettings.load()
+
+    @override_settings(SITE_SETTINGS_CACHE_TTL=0)
+    def test_save_bumps_version_and_forces_one_reload(self):
+        SiteSettings.load()
+        with self.assertNumQueries(0):
+            # Checks the shared version on every call, still without the database
+            SiteSettings.load()
+
+        version = cache.get(SiteSettings.CACHE_VERSION_KEY)
+        settings_obj = SiteSettings.objects.get(pk=1)
+        settings_obj.site_name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_obj.save()
+        self.assertNotEqual(cache.get(SiteSettings.CACHE_VERSION_KEY), version)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(SiteSettings.load().site_name, 'Renamed')
+        with self.assertNumQueries(0):
+            SiteSettings.load()
+
+    @override_settings(SITE_SETTINGS_CACHE_TTL=0)
+    def test_version_bumped_by_another_worker_forces_one_reload(self):
+        SiteSettings.load()
+        # Another worker saved: only the shared version changes here
+        SiteSettings.objects.filter(pk=1).update(site_name='Edited elsewhere')
+        cache.set(SiteSettings.CACHE_VERSION_KEY, 'another-version', None)
+        with self.assertNumQueries(1):
+            self.assertEqual(SiteSettings.load().site_name, 'Edited elsewhere')
+        with self.assertNumQueries(0):
+            SiteSettings.load()
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class ProductCardCacheTests(TestCase):
+    """Cached product cards last until the product changes or a new release"""
+
+    def setUp(self):
+        cache.clear()
+        fragment_cache_version.cache_clear()
+        self.addCleanup(fragment_cache_version.cache_clear)
+
+    def cards(self):
+        response = self.client.get('/products/more/?offset=0')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_new_release_renders_cards_again(self):
+        create_catalog(2)
+        self.assertIn('item product 1', self.cards())
+        # Not a product change (updated_at stays), so the cached cards are served
+        Product.objects.update(name=Concat('name', Value(' v2')))
+        self.assertNotIn(' v2', self.cards())
+
+        with override_settings(TEMPLATE_CACHE_VERSION='next-release'):
+            fragment_cache_version.cache_clear()
+            cards = self.cards()
+        self.assertIn('item product 0 v2', cards)
+        self.assertIn('item product 1 v2', cards)
+
+    def test_version_follows_template_source(self):
+        version = fragment_cache_version('partials/product_card.html')
+        self.assertEqual(fragment_cache_version('partials/product_card.html'), version)
+        self.assertNotEqual(fragment_cache_version('partials/product_cards.html'), version)
+
+
+class RelatedProductsDatabaseTests(TestCase):
+    """The related products index is kept in the database the products are saved to"""
+
+    alias = 'related_scratch'
+
+    def setUp(self):
+        # A scratch database like the benchmark commands use
+        connections.databases[self.alias] = {
+            **connections.databases['default'],
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+            'OPTIONS': {},
+        }
+        self.addCleanup(connections.databases.pop, self.alias)
+        self.addCleanup(connections.__delitem__, self.alias)
+        self.addCleanup(lambda: connections[self.alias].close())
+        call_command('migrate', database=self.alias, verbosity=0)
+
+    def test_index_follows_using(self):
+        category = Category.objects.using(self.alias).create(name='Scratch', slug='scratch')
+        tag = Tag.objects.using(self.alias).create(name='Scratch', slug='scratch')
+        first, second = [
+            Product.objects.using(self.alias).create(
+                name=f'Scratch {i}', slug=f'scratch-{i}', description='-', price=Decimal('10.00'), category=category,
+            )
+            for i in range(2)
+        ]
+        second.tags.add(tag)
+
+        related = RelatedProduct.objects.using(self.alias).order_by('product_id')
+        self.assertEqual(
+            list(related.values_list('product_id', 'related_id', 'score')),
+            [(first.pk, second.pk, 2), (second.pk, first.pk, 2)],
+        )
+        self.assertFalse(RelatedProduct.objects.exists())
@@ -0,0 +1,123 @@
+"""
+Payment screenshot uploads.
+
+The order endpoint installs BoundedUploadHandler, which streams the upload
+to a temporary file in chunks and aborts as soon as the body or a file
+passes PAYMENT_SCREENSHOT_MAX_SIZE, instead of buffering a 20 MB body
+before the size is checked. PaymentScreenshotField then only accepts
+JPEG, PNG and WebP (by their magic bytes, before Pillow parses anything)
+and stores a re-encoded JPEG, downscaled to PAYMENT_SCREENSHOT_MAX_DIMENSION
+and without the EXIF data phones attach (location, device).
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+# Room for the other order fields and the multipart framing
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Leading bytes of the accepted formats
+MAGIC_BYTES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+)
+
+
+class UploadTooLarge(MultiPartParserError):
+    pass
+
+
+def _too_large_message(max_size):
+    return f'Screenshot must be {filesizeformat(max_size)} or smaller.'
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded files to disk and rejects oversize uploads without
+    reading the rest of the body. Raises UploadTooLarge, which DRF's
+    MultiPartParser turns into a 400.
+    """
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or settings.PAYMENT_SCREENSHOT_MAX_SIZE
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Content-Length is checked before any of the body is read
+        if content_length and content_length > self.max_size + MULTIPART_OVERHEAD:
+            raise UploadTooLarge(_too_large_message(self.max_size))
+
+    def receive_data_chunk(self, raw_data, start):
+        # Chunked requests have no Content-Length to check up front
+        if start + len(raw_data) > self.max_size:
+            self.file.close()
+            raise UploadTooLarge(_too_large_message(self.max_size))
+        return super().receive_data_chunk(raw_data, start)
+
+
+def sniff_image_format(file):
+    """'JPEG', 'PNG' or 'WEBP' from the file's leading bytes, else None"""
+    file.seek(0)
+    head = file.read(12)
+    file.seek(0)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'WEBP'
+    for magic, image_format in MAGIC_BYTES:
+        if head.startswith(magic):
+            return image_format
+    return None
+
+
+def recompress_image(file, max_dimension, quality):
+    """
+    Re-encode an uploaded image as a JPEG no larger than max_dimension on
+    either side. The camera rotation is applied and metadata is dropped.
+    """
+    file.seek(0)
+    image = Image.open(file)
+    # Lets the JPEG decoder downscale while decoding
+    image.draft('RGB', (max_dimension, max_dimension))
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.getchannel('A'))
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    stem = os.path.splitext(os.path.basename(file.name or 'screenshot'))[0]
+    return ContentFile(buffer.getvalue(), name=f'{stem}.jpg')
+
+
+class PaymentScreenshotField(serializers.ImageField):
+    """Image upload checked by size, magic bytes and pixel count, then recompressed"""
+    default_error_messages = {
+        'invalid_format': 'Upload a JPEG, PNG or WebP image.',
+        'too_many_pixels': 'Screenshot resolution is too large.',
+    }
+
+    def to_internal_value(self, data):
+        max_size = settings.PAYMENT_SCREENSHOT_MAX_SIZE
+        if getattr(data, 'size', 0) > max_size:
+            raise serializers.ValidationError(_too_large_message(max_size))
+        if hasattr(data, 'read') and sniff_image_format(data) is None:
+            self.fail('invalid_format')
+        # Pillow's header check (verify()), as for any ImageField
+        file = super().to_internal_value(data)
+        width, height = file.image.size
+        if width * height > settings.PAYMENT_SCREENSHOT_MAX_PIXELS:
+            self.fail('too_many_pixels')
+        try:
+            return recompress_image(
+                file, settings.PAYMENT_SCREENSHOT_MAX_DIMENSION, settings.PAYMENT_SCREENSHOT_QUALITY,
+            )
+        except (OSError, Image.DecompressionBombError) as exc:
+            # Truncated or corrupt data past the header
+            raise serializers.ValidationError(self.error_messages['invalid_image']) from exc
@@ -1,137 +1,134 @@
 """
 Utility functions for the API app
 """
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
-from django.utils.html import strip_tags
-from .models import SiteSettings
+from .email_rendering import renderer
+from .mailer import get_connection_pool
 
 
-def _email_context():
-    settings_obj, _ = SiteSettings.objects.get_or_create(pk=1)
-    support_email = settings_obj.support_email or getattr(settings, 'SUPPORT_EMAIL', '')
-    from_email = settings_obj.from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', support_email)
-    return settings_obj, support_email, from_email
+def _build_order_email(order, subject_prefix, template_base):
+    """
+    Render an order email (HTML with a plain text alternative)
+
+    Returns:
+        EmailMultiAlternatives ready to be sent
+    """
+    site_context = renderer.site_context()
+    subject = f'{subject_prefix} - Order #{order.id} - {settings.SITE_NAME}'
+
+    # Render HTML and plain text versions from the cached templates
+    html_message, plain_message = renderer.render(template_base, {
+        'order': order,
+        'product': order.product,
+    })
+
+    message = EmailMultiAlternatives(
+        subject=subject,
+        body=plain_message,
+        from_email=site_context['from_email'],
+        to=[order.email],
+    )
+    message.attach_alternative(html_message, 'text/html')
+    return message
+
+
+def build_order_confirmation_email(order):
+    return _build_order_email(order, 'Order Confirmation', 'order_confirmation')
+
+
+def build_download_link_email(order):
+    return _build_order_email(order, 'Download Link', 'download_link')
+
+
+def build_payment_verified_email(order):
+    return _build_order_email(order, 'Payment Verified', 'payment_verified')
 
 
-def send_order_confirmation_email(order):
+def send_order_confirmation_email(order, fail_silently=True):
     """
     Send order confirmation email to customer
-    
+
     Args:
         order: Order instance
+        fail_silently: Return False instead of raising on delivery errors
     """
     try:
-        settings_obj, support_email, from_email = _email_context()
-        subject = f'Order Confirmation - Order #{order.id} - {settings.SITE_NAME}'
-        
-        # Prepare context for email template
-        context = {
-            'order': order,
-            'product': order.product,
-            'site_name': settings.SITE_NAME,
-            'site_url': settings.SITE_URL,
-            'support_email': support_email,
-        }
-        
-        # Render HTML email
-        html_message = render_to_string('emails/order_confirmation.html', context)
-        
-        # Plain text version (strip HTML tags)
-        plain_message = strip_tags(html_message)
-        
-        # Send email
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=from_email,
-            recipient_list=[order.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        
+        message = build_order_confirmation_email(order)
+        get_connection_pool().send_messages([message])
         return True
     except Exception as e:
+        if not fail_silently:
+            raise
         print(f"Error sending order confirmation email: {e}")
         return False
 
 
-def send_download_link_email(order):
+def send_download_link_email(order, fail_silently=True):
     """
     Send download link email to customer after payment
-    
+
     Args:
         order: Order instance with download_link
+        fail_silently: Return False instead of raising on delivery errors
     """
     if not order.download_link:
         return False
-        
+
     try:
-        settings_obj, support_email, from_email = _email_context()
-        subject = f'Download Link - Order #{order.id} - {settings.SITE_NAME}'
-        
-        # Prepare context for email template
-        context = {
-            'order': order,
-            'product': order.product,
-            'site_name': settings.SITE_NAME,
-            'site_url': settings.SITE_URL,
-            'support_email': support_email,
-        }
-        
-        # Render HTML email
-        html_message = render_to_string('emails/download_link.html', context)
-        
-        # Plain text version
-        plain_message = strip_tags(html_message)
-        
-        # Send email
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=from_email,
-            recipient_list=[order.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        
+        message = build_download_link_email(order)
+        get_connection_pool().send_messages([message])
+
         # Mark as sent
         order.download_sent = True
         order.save(update_fields=['download_sent'])
-        
+
         return True
     except Exception as e:
+        if not fail_silently:
+            raise
         print(f"Error sending download link email: {e}")
         return False
 
 
-def send_payment_verified_email(order):
+def send_payment_verified_email(order, fail_silently=True):
     """
     Send payment verified email to customer
     """
     try:
-        settings_obj, support_email, from_email = _email_context()
-        subject = f'Payment Verified - Order #{order.id} - {settings.SITE_NAME}'
-        context = {
-            'order': order,
-            'product': order.product,
-            'site_name': settings.SITE_NAME,
-            'site_url': settings.SITE_URL,
-            'support_email': support_email,
-        }
-        html_message = render_to_string('emails/payment_verified.html', context)
-        plain_message = strip_tags(html_message)
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=from_email,
-            recipient_list=[order.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        message = build_payment_verified_email(order)
+        get_connection_pool().send_messages([message])
         return True
     except Exception as e:
+        if not fail_silently:
+            raise
         print(f"Error sending payment verified email: {e}")
         return False
 
+
+def send_payment_verified_emails(orders):
+    """
+    Send payment verified emails for many orders over pooled connections
+
+    Returns:
+        List of the orders whose email could not be rendered or sent
+    """
+    unsent = []
+    messages = {}
+    for order in orders:
+        try:
+            messages[build_payment_verified_email(order)] = order
+        except Exception as e:
+            print(f"Error rendering payment verified email for order {order.id}: {e}")
+            unsent.append(order)
+    failed = []
+    get_connection_pool().send_messages(messages, fail_silently=True, failed=failed)
+    return unsent + [messages[message] for message in failed]
+
+
+# Senders used by the outbound email queue, keyed by OutboundEmail.kind
+EMAIL_SENDERS = {
+    'order_confirmation': send_order_confirmation_email,
+    'download_link': send_download_link_email,
+    'payment_verified': send_payment_verified_email,
+}
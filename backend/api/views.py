@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Q
 from .models import Product, Category, Tag, Order, SiteSettings
 from .serializers import (
@@ -11,23 +12,86 @@ from .serializers import (
     OrderCreateSerializer, OrderDetailSerializer,
     SiteSettingsSerializer
 )
-from .utils import send_order_confirmation_email, send_download_link_email
+from .email_queue import enqueue_email
+from .pagination import CreatedAtCursorPagination, KeysetOrPageNumberPagination, stream_json_list
+from .caching import CachedResponseMixin
+from .fast_serializers import fast_serializer_for
+from .search import ProductSearchFilter
+from .uploads import BoundedUploadHandler
+from .catalog_index import ORDERINGS, fetch_products, get_catalog_snapshot, to_decimal
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class EagerLoadingViewSetMixin:
+    """
+    Applies the serializer's declared select/prefetch_related to
+    get_queryset(), so every action gets a constant number of queries.
+    Actions must build on self.get_queryset() rather than self.queryset.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
+
+
+class FastSerializerMixin:
+    """
+    Serializes JSON reads with the fast equivalents of the DRF serializers
+    (see fast_serializers.py). Views choose their DRF serializer in
+    get_base_serializer_class(), not get_serializer_class().
+    """
+
+    def get_base_serializer_class(self):
+        return super().get_serializer_class()
+
+    def get_serializer_class(self):
+        return fast_serializer_for(self.get_base_serializer_class(), self.request)
+
+
+class PaginatedActionMixin:
+    """
+    Paginates custom list actions with keyset pagination on created_at/id.
+    Pass `?stream=true` to stream the whole result as a JSON array instead
+    (for exports).
+    """
+    action_pagination_class = CreatedAtCursorPagination
+
+    def action_list_response(self, queryset, serializer_class=None):
+        if serializer_class is None:
+            serializer_class = self.get_serializer_class()
+        else:
+            serializer_class = fast_serializer_for(serializer_class, self.request)
+        context = self.get_serializer_context()
+
+        if self.request.query_params.get('stream', '').lower() in ('1', 'true'):
+            return stream_json_list(queryset, serializer_class, context)
+
+        paginator = self.action_pagination_class()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ProductViewSet(CachedResponseMixin, FastSerializerMixin, PaginatedActionMixin, EagerLoadingViewSetMixin,
+                     viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing products.
     Provides list and detail views.
     """
     queryset = Product.objects.filter(is_active=True)
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ProductSearchFilter (?q=) goes after OrderingFilter so it can order by relevance
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, ProductSearchFilter]
     filterset_fields = ['category', 'tags', 'is_featured']
+    # ?search= substring matching, kept for existing clients
     search_fields = ['name', 'description', 'short_description']
     ordering_fields = ['created_at', 'price', 'name']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetOrPageNumberPagination
 
-    def get_serializer_class(self):
+    def get_base_serializer_class(self):
         if self.action == 'retrieve':
             return ProductDetailSerializer
         return ProductListSerializer
@@ -35,9 +99,52 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured products"""
-        products = self.queryset.filter(is_featured=True)
-        serializer = self.get_serializer(products, many=True)
-        return Response(serializer.data)
+        products = self.get_queryset().filter(is_featured=True)
+        return self.action_list_response(products)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Facet counts (categories, tags, price buckets, featured) and the
+        first page of products for a combination of filters, answered from
+        the in-memory catalog index.
+
+        Accepts `category`, `tags` (repeatable, any of), `is_featured`,
+        `min_price`, `max_price`, `ordering` and `page_size`.
+        """
+        params = request.query_params
+
+        def to_int(value):
+            # Ids and page sizes; not isdigit(), which accepts '²'
+            try:
+                number = int(value)
+            except (TypeError, ValueError):
+                return None
+            return number if number >= 0 else None
+
+        featured = params.get('is_featured', '').lower()
+        filters = {
+            'category': to_int(params.get('category')),
+            'tags': [tag for tag in map(to_int, params.getlist('tags')) if tag is not None],
+            'is_featured': {'true': True, '1': True, 'false': False, '0': False}.get(featured),
+            'min_price': to_decimal(params.get('min_price')),
+            'max_price': to_decimal(params.get('max_price')),
+        }
+        ordering = params.get('ordering', '-created_at')
+        if ordering.lstrip('-') not in ORDERINGS:
+            ordering = '-created_at'
+        page_size = min(to_int(params.get('page_size')) or 20, 100)
+
+        snapshot = get_catalog_snapshot()
+        mask = snapshot.filter(**filters)
+        ids = snapshot.ids_for(mask, ordering, limit=page_size)
+        serializer_class = fast_serializer_for(ProductListSerializer, request)
+        products = fetch_products(ids, serializer_class.setup_eager_loading(Product.objects.all()))
+        return Response({
+            'count': snapshot.count(mask),
+            'results': serializer_class(products, many=True, context=self.get_serializer_context()).data,
+            'facets': snapshot.facets(**filters),
+        })
 
     @action(detail=False, methods=['get'])
     def by_price(self, request):
@@ -45,29 +152,26 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         min_price = request.query_params.get('min_price')
         max_price = request.query_params.get('max_price')
         
-        queryset = self.queryset
+        queryset = self.get_queryset()
         if min_price:
             queryset = queryset.filter(price__gte=min_price)
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.action_list_response(queryset)
 
     @action(detail=False, methods=['get'])
     def by_category(self, request):
         """Get products by category slug"""
         category_slug = request.query_params.get('category')
+        queryset = self.get_queryset()
         if category_slug:
-            queryset = self.queryset.filter(category__slug=category_slug)
-        else:
-            queryset = self.queryset
+            queryset = queryset.filter(category__slug=category_slug)
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.action_list_response(queryset)
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CachedResponseMixin, PaginatedActionMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing categories.
     """
@@ -80,12 +184,13 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     def products(self, request, slug=None):
         """Get all products in a category"""
         category = self.get_object()
-        products = Product.objects.filter(category=category, is_active=True)
-        serializer = ProductListSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data)
+        products = ProductListSerializer.setup_eager_loading(
+            Product.objects.filter(category=category, is_active=True)
+        )
+        return self.action_list_response(products, ProductListSerializer)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedResponseMixin, PaginatedActionMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing tags.
     """
@@ -98,42 +203,47 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     def products(self, request, slug=None):
         """Get all products with a tag"""
         tag = self.get_object()
-        products = Product.objects.filter(tags=tag, is_active=True)
-        serializer = ProductListSerializer(products, many=True, context={'request': request})
-        return Response(serializer.data)
+        products = ProductListSerializer.setup_eager_loading(
+            Product.objects.filter(tags=tag, is_active=True)
+        )
+        return self.action_list_response(products, ProductListSerializer)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(FastSerializerMixin, PaginatedActionMixin, EagerLoadingViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing orders.
     """
     queryset = Order.objects.all()
     permission_classes = [AllowAny]  # Change to IsAuthenticated in production
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetOrPageNumberPagination
 
-    def get_serializer_class(self):
+    def get_base_serializer_class(self):
         if self.action == 'create':
             return OrderCreateSerializer
         return OrderDetailSerializer
 
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == 'create':
+            # Stream the screenshot to disk and stop oversize uploads early
+            request.upload_handlers = [BoundedUploadHandler(request)]
+        return drf_request
+
     def create(self, request, *args, **kwargs):
         """Create a new order"""
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        order = serializer.save()
-        
-        # Send order confirmation email
-        try:
-            send_order_confirmation_email(order)
-        except Exception as e:
-            # Log error but don't fail the order creation
-            print(f"Failed to send order confirmation email: {e}")
         
-        # If order has download link and is completed, send download link email
-        if order.download_link and order.status == 'completed':
-            try:
-                send_download_link_email(order)
-            except Exception as e:
-                print(f"Failed to send download link email: {e}")
+        # Queue emails in the same transaction as the order; the email
+        # worker sends them, so checkout never waits on SMTP
+        with transaction.atomic():
+            order = serializer.save()
+            enqueue_email(order, 'order_confirmation')
+            
+            # If order has download link and is completed, send download link email
+            if order.download_link and order.status == 'completed':
+                enqueue_email(order, 'download_link')
         
         # Return order details
         detail_serializer = OrderDetailSerializer(order, context={'request': request})
@@ -157,21 +267,16 @@ class OrderViewSet(viewsets.ModelViewSet):
         if download_link:
             order.download_link = download_link
         
-        order.save()
-        
-        # Send download link email if download link was added and order is completed
-        if download_link and order.status == 'completed' and not old_download_link:
-            try:
-                send_download_link_email(order)
-            except Exception as e:
-                print(f"Failed to send download link email: {e}")
-        
-        # Send confirmation email if status changed to completed
-        if new_status == 'completed' and old_status != 'completed':
-            try:
-                send_order_confirmation_email(order)
-            except Exception as e:
-                print(f"Failed to send order confirmation email: {e}")
+        with transaction.atomic():
+            order.save()
+            
+            # Send download link email if download link was added and order is completed
+            if download_link and order.status == 'completed' and not old_download_link:
+                enqueue_email(order, 'download_link')
+            
+            # Send confirmation email if status changed to completed
+            if new_status == 'completed' and old_status != 'completed':
+                enqueue_email(order, 'order_confirmation')
         
         serializer = OrderDetailSerializer(order, context={'request': request})
         return Response(serializer.data)
@@ -183,22 +288,21 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not email:
             return Response({'error': 'Email parameter required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        orders = self.queryset.filter(email=email)
-        serializer = OrderDetailSerializer(orders, many=True, context={'request': request})
-        return Response(serializer.data)
+        orders = self.get_queryset().filter(email=email)
+        return self.action_list_response(orders, OrderDetailSerializer)
 
 
-class SiteSettingsViewSet(viewsets.ReadOnlyModelViewSet):
+class SiteSettingsViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for site settings.
     """
+    cache_dependencies = ('site',)
     queryset = SiteSettings.objects.all()
     serializer_class = SiteSettingsSerializer
     permission_classes = [AllowAny]
 
     def get_object(self):
         """Always return the first (and only) settings object"""
-        obj, created = SiteSettings.objects.get_or_create(pk=1)
-        return obj
+        return SiteSettings.load()
 
 
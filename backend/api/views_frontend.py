@@ -1,32 +1,56 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import Http404
 
+from api.caching import cache_storefront_page, fragment_cache_version
+from api.catalog_index import fetch_products, get_catalog_snapshot, to_decimal
 from api.models import Product, Category, Tag, Order, SiteSettings
+from api.related import related_products
 
-def index(request):
-    """Homepage view - Fully dynamic"""
-    # Get price filter from URL
+
+def _product_page_dependencies(request):
+    product_slug = request.GET.get('slug') or request.GET.get('product')
+    return [f'product:{product_slug}', 'site']
+
+
+def _product_cards_context(request, offset):
+    """
+    One page of homepage product cards from `offset`, and the offset of the
+    next page (None after the last)
+    """
+    # Filter the active products in memory, then fetch one page in one query
     price_filter = request.GET.get('price')
-    
-    # Get all active products
-    products = Product.objects.filter(is_active=True).order_by('-created_at')
-    
-    # Filter by price if specified
-    if price_filter:
-        try:
-            price_value = float(price_filter)
-            products = products.filter(price=price_value)
-        except ValueError:
-            # Invalid price filter, ignore it
-            pass
-    
-    context = {
-        'products': products,
+    snapshot = get_catalog_snapshot()
+    price_value = to_decimal(price_filter)  # Invalid price filters are ignored
+    ids = snapshot.ids_for(snapshot.filter(min_price=price_value, max_price=price_value))
+    end = offset + settings.INDEX_PAGE_SIZE
+    return {
+        'products': fetch_products(ids[offset:end]),
+        'next_offset': end if end < len(ids) else None,
         'price_filter': price_filter,
+        'card_cache_timeout': settings.PRODUCT_CARD_CACHE_TIMEOUT,
+        'card_cache_version': fragment_cache_version('partials/product_card.html'),
     }
-    
+
+
+@cache_storefront_page(lambda request: ['catalog', 'site'], query_params=['price'])
+def index(request):
+    """Homepage view - the first page of products; "Load More" fetches the rest"""
+    context = _product_cards_context(request, 0)
     return render(request, 'index.html', context)
 
+
+@cache_storefront_page(lambda request: ['catalog'], query_params=['price', 'offset'])
+def more_products(request):
+    """The homepage's next page of product cards, as an HTML fragment"""
+    try:
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        offset = 0
+    context = _product_cards_context(request, offset)
+    return render(request, 'partials/product_cards.html', context)
+
+@cache_storefront_page(_product_page_dependencies, query_params=['slug', 'product'])
 def product(request):
     """Product detail page view - Fully dynamic"""
     # Get product slug from URL parameter
@@ -47,42 +71,20 @@ def product(request):
             'product': None
         })
     
-    # Get related products (same category or tags)
-    # Start with base queryset
-    base_queryset = Product.objects.filter(is_active=True).exclude(id=product_obj.id)
-    
-    # Filter by category first
-    if product_obj.category:
-        related_products = base_queryset.filter(category=product_obj.category)
-    else:
-        related_products = base_queryset.none()  # Empty queryset if no category
-    
-    # If not enough, add by tags
-    if product_obj.tags.exists():
-        tag_related = base_queryset.filter(
-            tags__in=product_obj.tags.all()
-        ).distinct()
-        
-        # Combine querysets properly
-        if related_products.exists():
-            # Use union to combine querysets
-            related_products = related_products.union(tag_related)
-        else:
-            related_products = tag_related
-    
-    # Limit to 5 related products and ensure distinct
-    related_products = related_products.distinct()[:5]
+    # Get related products (same category or tags) from the precomputed index
+    related = related_products(product_obj)
     
     # Prepare context
     context = {
         'product': product_obj,
-        'related_products': related_products,
+        'related_products': related,
         'category': product_obj.category,
         'tags': product_obj.tags.all(),
     }
     
     return render(request, 'product.html', context)
 
+@cache_storefront_page(_product_page_dependencies, query_params=['slug', 'product'])
 def checkout(request):
     """Checkout page view - Fully dynamic"""
     # Get product slug from URL parameter
@@ -139,7 +141,7 @@ def payment(request):
         bump_offer_price = 99
         total_amount += bump_offer_price
     
-    settings_obj, _ = SiteSettings.objects.get_or_create(pk=1)
+    settings_obj = SiteSettings.load()
 
     context = {
         'product': product_obj,
@@ -185,17 +187,17 @@ def success(request):
 
 
 def privacy_policy(request):
-    settings_obj, _ = SiteSettings.objects.get_or_create(pk=1)
+    settings_obj = SiteSettings.load()
     return render(request, 'privacy.html', {'site_settings': settings_obj})
 
 
 def terms_conditions(request):
-    settings_obj, _ = SiteSettings.objects.get_or_create(pk=1)
+    settings_obj = SiteSettings.load()
     return render(request, 'terms.html', {'site_settings': settings_obj})
 
 
 def refund_policy(request):
-    settings_obj, _ = SiteSettings.objects.get_or_create(pk=1)
+    settings_obj = SiteSettings.load()
     return render(request, 'refund.html', {'site_settings': settings_obj})
 
 
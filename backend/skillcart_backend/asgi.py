@@ -9,12 +9,19 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillcart_backend.settings')
 
 application = get_asgi_application()
 
+# Parse every template before the first request (see TEMPLATE_WARMUP)
+if settings.TEMPLATE_WARMUP:
+    from api.template_warmup import warm_templates
+
+    warm_templates()
+
 
 
 
@@ -0,0 +1,21 @@
+"""
+Settings profiles, selected by DJANGO_ENV ('dev' by default, or 'prod'):
+
+    base.py  shared settings, configured from the environment or `.env`
+    dev.py   DEBUG, any host and CORS origin
+    prod.py  no DEBUG, required secrets, persistent database connections,
+             templates compiled at startup, secure cookies
+
+DJANGO_SETTINGS_MODULE=skillcart_backend.settings.prod selects a profile
+directly. `python manage.py selfcheck` verifies the active one.
+"""
+from decouple import config
+
+DJANGO_ENV = config('DJANGO_ENV', default='dev')
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ValueError(f"DJANGO_ENV must be 'dev' or 'prod', not {DJANGO_ENV!r}")
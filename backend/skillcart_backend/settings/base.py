@@ -0,0 +1,359 @@
+"""
+Django settings for skillcart_backend project, shared by every profile
+(see __init__.py). Values come from the environment or `.env`.
+"""
+
+from pathlib import Path
+from decouple import config, Csv
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+# (prod.py requires SECRET_KEY to be set)
+SECRET_KEY = config('SECRET_KEY', default='django-insecure-change-this-in-production-!@#$%^&*()')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*', cast=Csv())
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'rest_framework',
+    'corsheaders',
+    'api',
+]
+
+MIDDLEWARE = [
+    # First, so it compresses whatever the rest of the stack returns
+    'api.middleware.CompressionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    # Before sessions, so a saved session pins the client to the primary
+    'api.replicas.ReplicaPinningMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'api.middleware.ConditionalGetMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'skillcart_backend.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            # Each template is read and parsed once per process. Under DEBUG
+            # the autoreloader empties the cache when a template is edited.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'skillcart_backend.wsgi.application'
+
+# Compile every template when a worker starts (api/template_warmup.py), so a
+# broken template fails the deploy rather than a page. On in prod.py.
+TEMPLATE_WARMUP = config('TEMPLATE_WARMUP', default=False, cast=bool)
+
+
+# Database
+# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+
+# DB_ENGINE selects SQLite (the default, stored in SQLITE_PATH) or MySQL
+# (configured by the DB_* variables)
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'mysql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': config('DB_NAME', default='skillcart_db'),
+            'USER': config('DB_USER', default='root'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='3306'),
+            'OPTIONS': {
+                'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+                'charset': 'utf8mb4',
+            },
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    # WAL journaling and queued writers (api/sqlite_backend/base.py)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'api.sqlite_backend',
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),  # seconds
+                'transaction_mode': config('SQLITE_TRANSACTION_MODE', default='IMMEDIATE'),
+            },
+        }
+    }
+else:
+    raise ValueError(f"DB_ENGINE must be 'sqlite' or 'mysql', not {DB_ENGINE!r}")
+
+# Seconds a worker keeps its database connection open between requests
+# (0 closes it after every request; prod.py defaults to 600). Connections
+# are checked before reuse, so a restarted database server costs one retry.
+DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=0, cast=int)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Read replicas for the catalog (api/replicas.py): SQLite copies of the
+# primary kept in sync by `python manage.py sync_replicas`, or MySQL servers
+# replicating from DB_HOST. Each becomes a 'replicaN' alias.
+if DB_ENGINE == 'sqlite':
+    _replicas = [{'NAME': path} for path in config('SQLITE_REPLICA_PATHS', default='', cast=Csv())]
+else:
+    _replicas = [{'HOST': host} for host in config('DB_REPLICA_HOSTS', default='', cast=Csv())]
+for _number, _replica in enumerate(_replicas, 1):
+    DATABASES[f'replica{_number}'] = {
+        **DATABASES['default'],
+        **_replica,
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        # Tests only create the primary's database
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.replicas.CatalogReplicaRouter']
+
+# Seconds a client reads only from the primary after writing, so it sees
+# its own changes (e.g. the order it just placed)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+# Seconds between checks that the replicas have every catalog change
+REPLICA_CHECK_INTERVAL = config('REPLICA_CHECK_INTERVAL', default=5, cast=float)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Pages, API responses and their invalidation (api/caching.py) must be shared
+# by every worker: set REDIS_URL (e.g. redis://localhost:6379/0) when running
+# more than one. Without it each process has its own in-memory cache.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'skillcart',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': config('LOCMEM_CACHE_MAX_ENTRIES', default=5000, cast=int)},
+        }
+    }
+
+
+# Password validation
+# https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = [
+    BASE_DIR / 'static',
+]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Uploads are stored once per distinct content, under their hash
+# (api/storage.py). collectstatic writes hashed, minified and precompressed
+# static files (api/static_assets.py).
+STORAGES = {
+    'default': {'BACKEND': 'api.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'api.static_assets.CompressedManifestStaticFilesStorage'},
+}
+
+# Serve STATIC_ROOT from Django when DEBUG is off (e.g. no nginx in front)
+SERVE_STATIC = config('SERVE_STATIC', default=False, cast=bool)
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# REST Framework Configuration
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.AllowAny',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'PAGE_SIZE': 20,
+    'DEFAULT_FILTER_BACKENDS': [
+        'rest_framework.filters.SearchFilter',
+        'rest_framework.filters.OrderingFilter',
+    ],
+    # orjson-backed JSON; same output as DRF's defaults, which they fall back to
+    # when orjson isn't installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# CORS Configuration
+CORS_ALLOWED_ORIGINS = [
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+    "http://localhost:8000",
+    "http://127.0.0.1:8000",
+]
+
+CORS_ALLOW_ALL_ORIGINS = False  # dev.py allows every origin
+
+CORS_ALLOW_CREDENTIALS = True
+
+# Email Configuration
+# Automatically switches between console (development) and SMTP (production) based on environment variables
+
+# Email Backend: 'console' for development, 'smtp' for production
+EMAIL_BACKEND_TYPE = config('EMAIL_BACKEND_TYPE', default='console')  # Options: 'console', 'smtp', 'sendgrid'
+
+if EMAIL_BACKEND_TYPE == 'smtp':
+    # Gmail SMTP Configuration
+    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
+    EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+    EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+    EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+    EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+    
+elif EMAIL_BACKEND_TYPE == 'sendgrid':
+    # SendGrid SMTP Configuration
+    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    EMAIL_HOST = 'smtp.sendgrid.net'
+    EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+    EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+    EMAIL_HOST_USER = 'apikey'  # Always 'apikey' for SendGrid
+    EMAIL_HOST_PASSWORD = config('SENDGRID_API_KEY', default='')
+    
+else:
+    # Development: Console backend (prints emails to console)
+    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Seconds a worker serves SiteSettings.load() from memory before checking
+# the shared cache for edits made through another worker
+SITE_SETTINGS_CACHE_TTL = config('SITE_SETTINGS_CACHE_TTL', default=5, cast=int)
+
+# Seconds a rendered storefront page (index, product, checkout) stays cached;
+# entries are invalidated earlier whenever the catalog changes
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=600, cast=int)
+
+# Product cards on the homepage and per "Load More" request, and the seconds
+# a rendered card stays cached (cards are re-rendered when a product changes)
+INDEX_PAGE_SIZE = config('INDEX_PAGE_SIZE', default=9, cast=int)
+PRODUCT_CARD_CACHE_TIMEOUT = config('PRODUCT_CARD_CACHE_TIMEOUT', default=24 * 60 * 60, cast=int)
+
+# Part of the cached template fragments' keys, along with a hash of the
+# templates and the static manifest; set to the release (e.g. the git SHA)
+# to drop them on deploys that only change template tags or filters
+TEMPLATE_CACHE_VERSION = config('TEMPLATE_CACHE_VERSION', default='')
+
+# Seconds a rendered response of the read-only catalog API (products,
+# categories, tags, settings) stays cached; invalidated on changes as above
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=600, cast=int)
+
+# Response compression (api/middleware.py): bodies smaller than this many
+# bytes are sent as they are; brotli quality 0-11 (higher is smaller, slower)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+
+# Responsive image derivatives (api/images.py): widths in pixels, and the
+# threads building them after an upload (0 builds them inline)
+IMAGE_DERIVATIVE_WIDTHS = config('IMAGE_DERIVATIVE_WIDTHS', default='160,320,640,1024', cast=Csv(int))
+IMAGE_DERIVATIVE_WORKERS = config('IMAGE_DERIVATIVE_WORKERS', default=2, cast=int)
+
+# Payment screenshot uploads (api/uploads.py): rejected above the size or
+# pixel count, stored as a JPEG no larger than the dimension on either side
+PAYMENT_SCREENSHOT_MAX_SIZE = config('PAYMENT_SCREENSHOT_MAX_SIZE', default=20 * 1024 * 1024, cast=int)  # bytes
+PAYMENT_SCREENSHOT_MAX_PIXELS = config('PAYMENT_SCREENSHOT_MAX_PIXELS', default=40_000_000, cast=int)
+PAYMENT_SCREENSHOT_MAX_DIMENSION = config('PAYMENT_SCREENSHOT_MAX_DIMENSION', default=2000, cast=int)
+PAYMENT_SCREENSHOT_QUALITY = config('PAYMENT_SCREENSHOT_QUALITY', default=85, cast=int)
+
+# Pooled email connections (api/mailer.py)
+EMAIL_POOL_SIZE = config('EMAIL_POOL_SIZE', default=4, cast=int)
+EMAIL_POOL_IDLE_TIMEOUT = config('EMAIL_POOL_IDLE_TIMEOUT', default=60, cast=int)  # seconds before an idle connection is reopened
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=50, cast=int)  # messages sent per connection checkout
+
+# Outbound Email Queue
+# Emails are queued by the API and sent by `python manage.py process_email_queue`
+EMAIL_QUEUE_WORKERS = config('EMAIL_QUEUE_WORKERS', default=4, cast=int)
+EMAIL_QUEUE_MAX_ATTEMPTS = config('EMAIL_QUEUE_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_QUEUE_RETRY_BACKOFF = config('EMAIL_QUEUE_RETRY_BACKOFF', default=30, cast=int)  # seconds, doubled per attempt
+EMAIL_QUEUE_LEASE_SECONDS = config('EMAIL_QUEUE_LEASE_SECONDS', default=300, cast=int)  # reclaim rows from crashed workers
+
+# Site Information
+SITE_NAME = config('SITE_NAME', default='Skilcart')
+SITE_URL = config('SITE_URL', default='http://127.0.0.1:8000')
+SUPPORT_EMAIL = config('SUPPORT_EMAIL', default='support@skilcart.com')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=f'{SITE_NAME} <{SUPPORT_EMAIL}>')
+
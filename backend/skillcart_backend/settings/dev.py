@@ -0,0 +1,11 @@
+"""
+Development settings: DEBUG on, any host and CORS origin.
+"""
+from .base import *  # noqa: F401,F403
+from .base import config
+
+DJANGO_ENV = 'dev'
+
+DEBUG = config('DEBUG', default=True, cast=bool)
+
+CORS_ALLOW_ALL_ORIGINS = True
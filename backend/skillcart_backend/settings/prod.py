@@ -0,0 +1,30 @@
+"""
+Production settings.
+
+DEBUG is always off: under DEBUG Django keeps every SQL query of a request
+in memory (connection.queries) and renders tracebacks for errors, which
+long-lived workers can't afford. SECRET_KEY and ALLOWED_HOSTS must be set.
+"""
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, SITE_URL, Csv, config
+
+DJANGO_ENV = 'prod'
+
+DEBUG = False
+
+SECRET_KEY = config('SECRET_KEY')
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
+
+# Reuse each worker's database connections for up to 10 minutes
+for _database in DATABASES.values():
+    _database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=600, cast=int)
+
+TEMPLATE_WARMUP = config('TEMPLATE_WARMUP', default=True, cast=bool)
+
+CORS_ALLOW_ALL_ORIGINS = False
+CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default=SITE_URL, cast=Csv())
+
+# HTTPS only; set to False when serving over plain HTTP (e.g. behind a VPN)
+SESSION_COOKIE_SECURE = config('SESSION_COOKIE_SECURE', default=True, cast=bool)
+CSRF_COOKIE_SECURE = config('CSRF_COOKIE_SECURE', default=True, cast=bool)
+CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default=SITE_URL, cast=Csv())
@@ -1,5 +1,7 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.shortcuts import HttpResponse
 from django.conf import settings
 from django.conf.urls.static import static
@@ -8,7 +10,9 @@ from django.conf.urls.static import static
 def debug_home(request):
     return HttpResponse("<h1>Homepage is Working!</h1>")
 
-from api.views_frontend import index, product, checkout, payment, success, privacy_policy, terms_conditions, refund_policy
+from api.static_assets import serve_static
+from api.storage import serve_media
+from api.views_frontend import index, more_products, product, checkout, payment, success, privacy_policy, terms_conditions, refund_policy
 
 urlpatterns = [
     # Debug path
@@ -17,6 +21,7 @@ urlpatterns = [
     # Real paths
     path('', index, name='index'),
     path('home/', index, name='home'),
+    path('products/more/', more_products, name='more_products'),
     path('product.html', product, name='product'),
     path('checkout.html', checkout, name='checkout'),
     path('payment.html', payment, name='payment'),
@@ -31,11 +36,14 @@ urlpatterns = [
 
 # Serve media files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.STATIC_URL, view=serve_static, document_root=settings.STATIC_ROOT)
 else:
     # In production, serve media files through your web server (nginx/apache)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
+    if settings.SERVE_STATIC:
+        # Collected static files, when nothing in front of Django serves them
+        urlpatterns += [re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static)]
 
 print(f"DEBUG: Final urlpatterns count: {len(urlpatterns)}")
 
@@ -9,12 +9,19 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillcart_backend.settings')
 
 application = get_wsgi_application()
 
+# Parse every template before the first request (see TEMPLATE_WARMUP)
+if settings.TEMPLATE_WARMUP:
+    from api.template_warmup import warm_templates
+
+    warm_templates()
+
 
 
 
@@ -158,6 +158,18 @@ if (typeof module !== 'undefined' && module.exports) {
  * Frontend Helper Functions
  */
 
+/**
+ * <img> for a product's display image, with srcsets of its resized copies
+ * (display_image_srcset) when the API has them
+ */
+function productImageHtml(product, sizes, style) {
+    const srcset = product.display_image_srcset || {};
+    const img = `<img src="${product.display_image}" alt="${product.name}" style="${style}"` +
+        (srcset.jpeg ? ` srcset="${srcset.jpeg}" sizes="${sizes}">` : '>');
+    if (!srcset.webp) return img;
+    return `<picture style="display: contents"><source type="image/webp" srcset="${srcset.webp}" sizes="${sizes}">${img}</picture>`;
+}
+
 /**
  * Render products to the page
  */
@@ -249,7 +261,7 @@ async function renderProductDetails(slug) {
         const imageEl = document.querySelector('.product-featured-image');
         if (imageEl) {
             if (fullProduct.display_image) {
-                imageEl.innerHTML = `<img src="${fullProduct.display_image}" alt="${fullProduct.name}" style="width: 100%; height: auto; border-radius: 8px;">`;
+                imageEl.innerHTML = productImageHtml(fullProduct, '(max-width: 768px) 100vw, 800px', 'width: 100%; height: auto; border-radius: 8px;');
             } else {
                 imageEl.innerHTML = `
                     <div class="product-banner-placeholder" style="background: linear-gradient(135deg, #1dbf73, #003a12); color: white; display: flex; align-items: center; justify-content: center; height: 400px; font-size: 2rem; font-weight: 700; border-radius: 8px;">
@@ -389,7 +401,7 @@ async function renderCheckoutPage(productSlug) {
         const productImg = document.querySelector('.checkout-product-img-wrapper');
         if (productImg) {
             if (fullProduct.display_image) {
-                productImg.innerHTML = `<img src="${fullProduct.display_image}" alt="${fullProduct.name}" style="width: 100%; height: 100%; object-fit: cover; border-radius: 12px;">`;
+                productImg.innerHTML = productImageHtml(fullProduct, '(max-width: 768px) 100vw, 600px', 'width: 100%; height: 100%; object-fit: cover; border-radius: 12px;');
             } else {
                 productImg.innerHTML = fullProduct.name;
             }
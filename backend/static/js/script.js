@@ -220,25 +220,16 @@ window.addEventListener('scroll', () => {
 // Add transition to header
 header.style.transition = 'transform 0.3s ease-in-out, box-shadow 0.3s ease-in-out';
 
-// Load More Button - Show remaining products
+// Load More Button - Fetch the next page of product cards from the server
 const loadMoreBtn = document.getElementById('loadMoreBtn');
 const loadMoreContainer = document.getElementById('loadMoreContainer');
 
-if (loadMoreBtn) {
-    loadMoreBtn.addEventListener('click', () => {
-        // Get all hidden products (those with product-hidden class and display:none)
-        const allHiddenProducts = document.querySelectorAll('.product-card.product-hidden');
-        const hiddenProducts = Array.from(allHiddenProducts).filter(product => {
-            // Only include products that are hidden by our logic, not by price filtering
-            // If it has display:none but is part of the filtered set, include it
-            return true;
-        });
-        
-        if (hiddenProducts.length === 0) {
-            // No more products to show
-            if (loadMoreContainer) {
-                loadMoreContainer.style.display = 'none';
-            }
+if (loadMoreBtn && loadMoreContainer) {
+    loadMoreBtn.addEventListener('click', async () => {
+        const productGrid = document.getElementById('productGrid');
+        const nextOffset = loadMoreContainer.dataset.nextOffset;
+        if (!productGrid || !nextOffset) {
+            loadMoreContainer.style.display = 'none';
             return;
         }
 
@@ -249,42 +240,52 @@ if (loadMoreBtn) {
         loadMoreBtn.style.cursor = 'not-allowed';
         loadMoreBtn.disabled = true;
 
-        // Show hidden products with animation
-        setTimeout(() => {
-            hiddenProducts.forEach((product, index) => {
+        const params = new URLSearchParams({ offset: nextOffset });
+        if (loadMoreContainer.dataset.price) {
+            params.set('price', loadMoreContainer.dataset.price);
+        }
+
+        try {
+            const response = await fetch(`${loadMoreContainer.dataset.url}?${params.toString()}`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const fragment = document.createElement('template');
+            fragment.innerHTML = await response.text();
+
+            // The fragment ends with the offset of the page after it, if any
+            const next = fragment.content.querySelector('.load-more-next');
+            loadMoreContainer.dataset.nextOffset = next ? next.dataset.nextOffset : '';
+            if (next) {
+                next.remove();
+            }
+
+            const products = Array.from(fragment.content.querySelectorAll('.product-card'));
+            products.forEach((product, index) => {
+                product.style.opacity = '0';
+                product.style.transform = 'translateY(20px)';
+                product.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+                productGrid.appendChild(product);
                 setTimeout(() => {
-                    product.classList.remove('product-hidden');
-                    product.style.display = ''; // Reset display to show the product
-                    product.style.opacity = '0';
-                    product.style.transform = 'translateY(20px)';
-                    product.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
-                    
-                    // Trigger reflow
-                    product.offsetHeight;
-                    
                     // Animate in
                     product.style.opacity = '1';
                     product.style.transform = 'translateY(0)';
                 }, index * 50); // Stagger animation
             });
+        } catch (error) {
+            console.error('Error loading more products:', error);
+        }
 
-            // Check if there are more products to show
-            setTimeout(() => {
-                const remainingHidden = document.querySelectorAll('.product-card.product-hidden');
-                if (remainingHidden.length === 0) {
-                    // Hide load more button if all products are shown
-                    if (loadMoreContainer) {
-                        loadMoreContainer.style.display = 'none';
-                    }
-                } else {
-                    // Reset button
-                    loadMoreBtn.textContent = originalText;
-                    loadMoreBtn.style.opacity = '1';
-                    loadMoreBtn.style.cursor = 'pointer';
-                    loadMoreBtn.disabled = false;
-                }
-            }, hiddenProducts.length * 50 + 300);
-        }, 300);
+        if (loadMoreContainer.dataset.nextOffset) {
+            // Reset button
+            loadMoreBtn.textContent = originalText;
+            loadMoreBtn.style.opacity = '1';
+            loadMoreBtn.style.cursor = 'pointer';
+            loadMoreBtn.disabled = false;
+        } else {
+            // Hide load more button if all products are shown
+            loadMoreContainer.style.display = 'none';
+        }
     });
 }
 
@@ -375,67 +376,19 @@ if (checkoutForm) {
 console.log('%c🚀 Welcome to Skilcart (single-page version)! ', 'background: linear-gradient(135deg, #6366f1, #ec4899); color: white; font-size: 20px; padding: 10px; border-radius: 5px;');
 console.log('%cWebsite cloned, consolidated into one HTML, and optimized for simple checkout.', 'color: #10b981; font-size: 14px;');
 
-// Price Filtering Logic
+// Price Filtering - the server renders only the matching products
 document.addEventListener('DOMContentLoaded', () => {
     const urlParams = new URLSearchParams(window.location.search);
     const filterPrice = urlParams.get('price');
 
-    if (filterPrice) {
-        const productCards = document.querySelectorAll('.product-card[data-price]');
-        let visibleCount = 0;
-        const matchingProducts = [];
-
-        // First, collect all matching products
-        productCards.forEach(card => {
-            const price = card.getAttribute('data-price');
-            if (price === filterPrice) {
-                matchingProducts.push(card);
-            } else {
-                // Hide cards that don't match the price filter completely
-                card.style.display = 'none';
-                card.classList.add('product-hidden');
-            }
-        });
-
-        // Show first 9 matching products, hide the rest
-        matchingProducts.forEach((card, index) => {
-            if (index < 9) {
-                card.style.display = '';
-                card.classList.remove('product-hidden');
-                visibleCount++;
-            } else {
-                card.style.display = 'none';
-                card.classList.add('product-hidden');
-            }
-        });
-
-        // Show/hide load more button based on filtered results
-        const hiddenFilteredProducts = matchingProducts.filter((card, index) => index >= 9);
-        const loadMoreContainer = document.getElementById('loadMoreContainer');
-        if (hiddenFilteredProducts.length > 0 && loadMoreContainer) {
-            loadMoreContainer.style.display = 'block';
-        } else if (loadMoreContainer) {
-            loadMoreContainer.style.display = 'none';
-        }
-
-        // Scroll to products if filtered
-        if (matchingProducts.length > 0) {
-            const productsSection = document.querySelector('.product-grid') || document.querySelector('#reels-bundle');
-            if (productsSection) {
-                // Small delay to ensure layout matches
-                setTimeout(() => {
-                    productsSection.scrollIntoView({ behavior: 'smooth' });
-                }, 100);
-            }
-        }
-    } else {
-        // No price filter - ensure load more works with default 9 products
-        const hiddenProducts = document.querySelectorAll('.product-card.product-hidden');
-        const loadMoreContainer = document.getElementById('loadMoreContainer');
-        if (hiddenProducts.length > 0 && loadMoreContainer) {
-            loadMoreContainer.style.display = 'block';
-        } else if (loadMoreContainer) {
-            loadMoreContainer.style.display = 'none';
+    // Scroll to products if filtered
+    if (filterPrice && document.querySelector('.product-card[data-price]')) {
+        const productsSection = document.querySelector('.product-grid') || document.querySelector('#reels-bundle');
+        if (productsSection) {
+            // Small delay to ensure layout matches
+            setTimeout(() => {
+                productsSection.scrollIntoView({ behavior: 'smooth' });
+            }, 100);
         }
     }
 });